@@ -8,41 +8,58 @@ Includes complex, branching management algorithms.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from enum import Enum, auto
-from typing import List, Optional, Dict, Union, Tuple, Any
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields, replace
+from enum import Enum, IntEnum, auto
+from typing import List, Optional, Dict, Union, Tuple, Any, ClassVar, Type
 from datetime import datetime
+from functools import lru_cache
+import array
+import itertools
+import logging
 import math
+import sys
+
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed for the *_batch cohort scoring functions
+    np = None
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------
 # Section 1: Enums
 # ---------------------------------------------
 
+# Enums used in branching are IntEnums numbered in order of clinical severity, so they
+# compare as plain ints (e.g. severity >= DKASeverity.MODERATE).
+
 # --- General ---
 class Sex(Enum): MALE = auto(); FEMALE = auto()
 class BooleanStatus(Enum): YES = auto(); NO = auto(); UNKNOWN = auto()
 class DiseaseSeverity(Enum): MILD = auto(); MODERATE = auto(); SEVERE = auto(); LIFE_THREATENING = auto()
 
 # --- Cardiology ---
-class ACSType(Enum): STEMI = auto(); NSTEMI = auto(); UNSTABLE_ANGINA = auto()
-class KillipClass(Enum): CLASS_I = auto(); CLASS_II = auto(); CLASS_III = auto(); CLASS_IV = auto()
+class ACSType(IntEnum): UNSTABLE_ANGINA = 1; NSTEMI = 2; STEMI = 3
+class KillipClass(IntEnum): CLASS_I = 1; CLASS_II = 2; CLASS_III = 3; CLASS_IV = 4
 class RhythmType(Enum): SHOCKABLE = auto(); NON_SHOCKABLE = auto()
 class AxisDeviation(Enum): NORMAL = auto(); LEFT = auto(); RIGHT = auto(); EXTREME_RIGHT = auto()
 
 # --- Vascular ---
-class WellsScoreRiskPE(Enum): PE_LIKELY = auto(); PE_UNLIKELY = auto()
+class WellsScoreRiskPE(IntEnum): PE_UNLIKELY = 1; PE_LIKELY = 2
 
 # --- Respiratory ---
 class COPDExacerbationSeverity(Enum): MILD = auto(); MODERATE = auto(); SEVERE = auto(); LIFE_THREATENING = auto() # For COPD
 
 # --- Endocrinology ---
 class HypertensionStage(Enum): STAGE_1 = auto(); STAGE_2 = auto(); SEVERE = auto()
-class DKASeverity(Enum): MILD = auto(); MODERATE = auto(); SEVERE = auto() # Based on pH/Bicarb/Ketones
+class DKASeverity(IntEnum): MILD = 1; MODERATE = 2; SEVERE = 3 # Based on pH/Bicarb/Ketones
 
 # --- Rheumatology ---
-class RAActivityLevel(Enum): LOW = auto(); MODERATE = auto(); HIGH = auto()
+class RAActivityLevel(IntEnum): LOW = 1; MODERATE = 2; HIGH = 3
+_RA_HIGH, _RA_MOD, _RA_LOW = RAActivityLevel.HIGH.name, RAActivityLevel.MODERATE.name, RAActivityLevel.LOW.name # Branch outcome keys
 class UCExtent(Enum): PROCTITIS = auto(); PROCTOSIGMOIDITIS = auto(); LEFT_SIDED_COLITIS = auto(); EXTENSIVE_COLITIS = auto(); PANCŌLITIS = auto()
-class UCSeverity(Enum): MILD = auto(); MODERATE = auto(); SEVERE = auto() # Truelove & Witts simplified
+class UCSeverity(IntEnum): MILD = 1; MODERATE = 2; SEVERE = 3 # Truelove & Witts simplified
 
 # --- Neurology ---
 class StrokeType(Enum): ISCHAEMIC = auto(); HAEMORRHAGIC = auto()
@@ -59,7 +76,7 @@ class InvestigationType(Enum): ECG = auto(); TROPONIN = auto(); CHEST_XRAY = aut
 # Section 2: Data Models
 # ---------------------------------------------
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DrugRecommendation:
     name: str
     drug_class: Optional[DrugClass] = None
@@ -67,173 +84,351 @@ class DrugRecommendation:
     route: Optional[str] = None # e.g., "PO", "IV", "Nebulised", "Rectal", "SC"
     rationale: Optional[str] = None
     duration: Optional[str] = None
-    warnings: List[str] = field(default_factory=list)
+    warnings: Tuple[str, ...] = ()
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InvestigationRecommendation:
     investigation_type: InvestigationType
     details: Optional[str] = None
     rationale: Optional[str] = None
     urgency: Optional[str] = "Routine" # e.g., "Immediate", "Urgent", "Routine"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ActionRecommendation:
     description: str
     details: Optional[str] = None
 
-@dataclass
+# AlgorithmStep.render_flags bits: which optional parts a step has, so renderers can skip the rest
+_RENDER_DETAILS = 1
+_RENDER_DRUGS = 2
+_RENDER_END_OF_PATH = 4 # No default or conditional next step
+
+@dataclass(slots=True, frozen=True)
 class AlgorithmStep:
     step_id: str # Unique ID for referencing steps
     description: str # Description of the step/decision point
     condition: Optional[str] = None # Condition triggering this specific step (if part of a branch)
-    recommended_actions: List[ActionRecommendation] = field(default_factory=list)
-    investigation_recommendations: List[InvestigationRecommendation] = field(default_factory=list)
-    drug_recommendations: List[DrugRecommendation] = field(default_factory=list)
-    # For branching logic: Key = condition/result string, Value = next step ID
-    conditional_next_step_ids: Optional[Dict[str, str]] = None
+    recommended_actions: Tuple[ActionRecommendation, ...] = ()
+    investigation_recommendations: Tuple[InvestigationRecommendation, ...] = ()
+    drug_recommendations: Tuple[DrugRecommendation, ...] = ()
+    # For branching logic: (condition/result string, next step ID) pairs. Builders may pass a dict
+    # or None; __post_init__ always stores a tuple of pairs.
+    conditional_next_step_ids: Union[Tuple[Tuple[str, str], ...], Dict[str, str], None] = ()
     default_next_step_id: Optional[str] = None # Step to go to if no conditions met or branching not applicable
+    details: Optional[str] = None # Patient-specific detail, e.g. calculated score
+    warnings: Tuple[str, ...] = ()
+    final_diagnosis_recommendation: Optional[str] = None
+    stop_condition: Optional[str] = None
+    render_flags: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Literal IDs are interned by the compiler; also intern IDs built at runtime (f-strings,
+        # deserialised plans) so step lookups always hit the dict identity fast path
+        object.__setattr__(self, "step_id", sys.intern(self.step_id))
+        if self.default_next_step_id is not None:
+            object.__setattr__(self, "default_next_step_id", sys.intern(self.default_next_step_id))
+        # Steps have only a handful of outcomes, so a tuple of pairs is smaller than a dict and a
+        # linear scan over interned strings is as fast as hashing
+        branches = self.conditional_next_step_ids
+        pairs = branches.items() if isinstance(branches, dict) else (branches or ())
+        object.__setattr__(self, "conditional_next_step_ids", tuple((sys.intern(outcome), sys.intern(next_id)) for outcome, next_id in pairs))
+        object.__setattr__(self, "render_flags", (
+            (_RENDER_DETAILS if self.details else 0)
+            | (_RENDER_DRUGS if self.drug_recommendations else 0)
+            | (0 if self.default_next_step_id or self.conditional_next_step_ids else _RENDER_END_OF_PATH)
+        ))
+
+    def get_conditional_next(self, outcome: str) -> Optional[str]:
+        """Returns the next step ID for the given branch outcome, or None if the step has no such branch."""
+        for branch_outcome, next_id in self.conditional_next_step_ids:
+            if branch_outcome == outcome: return next_id
+        return None
 
-@dataclass
+# Plans and steps are immutable so builders can cache and share them between callers.
+# Use dataclasses.replace() to derive a modified copy.
+@dataclass(slots=True, frozen=True)
 class AlgorithmPlan:
     condition: str
     start_step_id: str # ID of the first step
-    steps: Dict[str, AlgorithmStep] = field(default_factory=dict) # All steps keyed by ID
-    warnings: List[str] = field(default_factory=list)
-    required_referrals: List[str] = field(default_factory=list)
+    steps: Tuple[AlgorithmStep, ...] = () # All steps, in insertion order; builders may pass a dict keyed by ID
+    warnings: Tuple[str, ...] = ()
+    required_referrals: Tuple[str, ...] = ()
     final_diagnosis_recommendation: Optional[str] = None
     stop_condition: Optional[str] = None
-
-@dataclass
+    _index: Dict[str, int] = field(init=False, repr=False, compare=False) # Step ID -> position in steps
+    default_path: Tuple[AlgorithmStep, ...] = field(init=False, repr=False, compare=False) # Steps reached by following default_next_step_id from the start, each once
+    default_path_loop_start: Optional[int] = field(init=False, repr=False, compare=False) # If the path cycles, position in default_path the last step leads back to
+
+    def __post_init__(self):
+        object.__setattr__(self, "start_step_id", sys.intern(self.start_step_id))
+        steps = tuple(self.steps.values()) if isinstance(self.steps, dict) else tuple(self.steps)
+        object.__setattr__(self, "steps", steps)
+        object.__setattr__(self, "_index", {step.step_id: i for i, step in enumerate(steps)})
+        path, seen, step = [], {}, self.get_step(self.start_step_id)
+        while step is not None and step.step_id not in seen: # Stop at a missing step or a cycle
+            seen[step.step_id] = len(path)
+            path.append(step)
+            step = self.get_step(step.default_next_step_id)
+        object.__setattr__(self, "default_path", tuple(path))
+        object.__setattr__(self, "default_path_loop_start", None if step is None else seen[step.step_id])
+
+    def get_step(self, step_id: Optional[str]) -> Optional[AlgorithmStep]:
+        """Returns the step with the given ID, or None if the plan has no such step."""
+        i = self._index.get(step_id)
+        return None if i is None else self.steps[i]
+
+    def to_compact(self) -> "CompactAlgorithmPlan":
+        """Flattens the step graph into index-based parallel arrays for fast traversal.
+
+        Edges to step IDs that are not in the plan become -1, like get_step() returning None.
+        """
+        steps = self.steps
+        index = self._index
+        return CompactAlgorithmPlan(
+            condition=self.condition,
+            start_index=index.get(self.start_step_id, -1),
+            step_ids=tuple(step.step_id for step in steps),
+            descriptions=tuple(step.description for step in steps),
+            default_next=array.array("i", (-1 if step.default_next_step_id is None else index.get(step.default_next_step_id, -1) for step in steps)),
+            conditional_next=tuple({outcome: index.get(next_id, -1) for outcome, next_id in step.conditional_next_step_ids} for step in steps),
+            steps=steps,
+            index=dict(index) # Copy: plans are cached and shared, so the plan's own index must not leak out
+        )
+
+@dataclass(slots=True, frozen=True)
+class CompactAlgorithmPlan:
+    """Structure-of-arrays view of an AlgorithmPlan; all per-step sequences share one step index.
+
+    Walk it with ``i = plan.default_next[i]`` (-1 marks the end of a path or a missing step) or
+    ``i = plan.conditional_next[i][outcome]``; no string hashing is needed per hop.
+    """
+    condition: str
+    start_index: int
+    step_ids: Tuple[str, ...]
+    descriptions: Tuple[str, ...]
+    default_next: array.array # Index of the default next step, -1 if none or not in the plan
+    conditional_next: Tuple[Dict[str, int], ...] # Outcome -> index of next step, -1 if not in the plan
+    steps: Tuple[AlgorithmStep, ...] # Full step data, for anything beyond navigation
+    index: Dict[str, int] # Step ID -> index
+
+@dataclass(slots=True, frozen=True)
 class RiskFactors:
-    modifiable: List[str] = field(default_factory=list)
-    non_modifiable: List[str] = field(default_factory=list)
-
-@dataclass
+    modifiable: Tuple[str, ...] = ()
+    non_modifiable: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        # Instances are shared per condition, so don't keep a caller's mutable list
+        object.__setattr__(self, "modifiable", tuple(self.modifiable))
+        object.__setattr__(self, "non_modifiable", tuple(self.non_modifiable))
+
+# Fields are grouped by type rather than by topic so the slot layout stays compact.
+# The "hot vitals" block comes first: Wells, GRACE and UC severity scoring all read it.
+# Frozen (and therefore hashable) so a snapshot can be shared or used as a cache key; use evolve() to update.
+@dataclass(slots=True, frozen=True, kw_only=True)
 class PatientData: # Keep for caller's convenience - Example fields
-    # --- Demographics ---
-    age: Optional[int] = None
-    sex: Optional[Sex] = None
+    # --- Hot vitals ---
+    heart_rate: Optional[int] = None
+    systolic_bp: Optional[int] = None
+    diastolic_bp: Optional[int] = None
+    respiratory_rate: Optional[int] = None
+    oxygen_saturation: Optional[float] = None
+    temperature_celsius: Optional[float] = None
+    # --- Floats ---
     weight_kg: Optional[float] = None
+    symptom_onset_hours_acs: Optional[float] = None # ACS
+    stroke_symptom_onset_hours: Optional[float] = None # Stroke
+    ra_das28_score: Optional[float] = None # RA
+    wells_score_pe: Optional[float] = None # Raw score
+    # Labs
+    creatinine_umol_l: Optional[float] = None
+    potassium_mmol_l: Optional[float] = None
+    blood_glucose_mmol_l: Optional[float] = None
+    blood_ketones_mmol_l: Optional[float] = None
+    ph_level: Optional[float] = None
+    bicarbonate_mmol_l: Optional[float] = None
+    wcc_x10e9_l: Optional[float] = None
+    haemoglobin_g_dl: Optional[float] = None
+    # --- Ints ---
+    age: Optional[int] = None
+    known_diabetes_type: Optional[int] = None # 1 or 2
+    gcs: Optional[int] = None
+    esr_mm_hr: Optional[int] = None
+    stroke_nihss_score: Optional[int] = None
+    grace_score: Optional[int] = None # Often calculated, not input directly
+    # --- Bools ---
     is_pregnant: Optional[bool] = None
-    # --- History / Clinical State ---
-    # Shared
+    # Shared history / clinical state
     smoker: Optional[bool] = None
     has_hypertension: Optional[bool] = None
     has_diabetes: Optional[bool] = None
-    known_diabetes_type: Optional[int] = None # 1 or 2
     has_heart_failure: Optional[bool] = None
     has_active_infection: Optional[bool] = None
     has_malignancy: Optional[bool] = None
     is_renal_impaired: Optional[bool] = None # Simplified
     high_bleeding_risk: Optional[bool] = None
+    had_cardiac_arrest: Optional[bool] = None
     # ACS
     has_chest_pain_suspicious_for_acs: Optional[bool] = None
-    symptom_onset_hours_acs: Optional[float] = None
+    is_troponin_raised: Optional[bool] = None
+    has_st_elevation: Optional[bool] = None
+    has_st_depression_or_twi: Optional[bool] = None
     # PE
     has_clinical_signs_dvt: Optional[bool] = None
     is_pe_most_likely_diagnosis: Optional[bool] = None
     had_immobilisation_or_surgery_last_4_weeks: Optional[bool] = None
     has_previous_dvt_or_pe: Optional[bool] = None
     has_haemoptysis: Optional[bool] = None
+    d_dimer_positive: Optional[bool] = None
+    ctpa_result_positive: Optional[bool] = None
     # COPD
     known_copd_patient: Optional[bool] = None
     sputum_purulent: Optional[bool] = None
-    # DKA
-    # diabetes type above
+    resp_acidosis_present: Optional[bool] = None
     # RA
-    ra_das28_score: Optional[float] = None
-    ra_failed_dmards: List[DrugClass] = field(default_factory=list)
     has_active_tb: Optional[bool] = None
-    # UC
-    uc_disease_extent: Optional[UCExtent] = None
-    uc_severity: Optional[UCSeverity] = None
     # Stroke
-    stroke_symptom_onset_hours: Optional[float] = None
-    stroke_nihss_score: Optional[int] = None
     stroke_has_intracranial_haemorrhage: Optional[bool] = None
     stroke_has_large_established_infarct: Optional[bool] = None
     stroke_has_thrombectomy_target_vessel: Optional[bool] = None
-    # --- Vitals ---
-    heart_rate: Optional[int] = None
-    systolic_bp: Optional[int] = None
-    diastolic_bp: Optional[int] = None
-    respiratory_rate: Optional[int] = None
-    oxygen_saturation: Optional[float] = None
-    temperature_celsius: Optional[float] = None
-    gcs: Optional[int] = None
+    # --- Enums ---
+    sex: Optional[Sex] = None
     killip_class: Optional[KillipClass] = None # Cardiology specific state
-    had_cardiac_arrest: Optional[bool] = None
-    # --- Labs ---
-    is_troponin_raised: Optional[bool] = None
-    d_dimer_positive: Optional[bool] = None
-    creatinine_umol_l: Optional[float] = None
-    potassium_mmol_l: Optional[float] = None
-    blood_glucose_mmol_l: Optional[float] = None
-    blood_ketones_mmol_l: Optional[float] = None
-    ph_level: Optional[float] = None
-    bicarbonate_mmol_l: Optional[float] = None
-    wcc_x10e9_l: Optional[float] = None
-    haemoglobin_g_dl: Optional[float] = None
-    esr_mm_hr: Optional[int] = None
-    # --- ECG ---
-    has_st_elevation: Optional[bool] = None
-    has_st_depression_or_twi: Optional[bool] = None
-    # --- Scores ---
-    grace_score: Optional[int] = None # Often calculated, not input directly
-    wells_score_pe: Optional[float] = None # Raw score
-    # --- Imaging ---
-    ctpa_result_positive: Optional[bool] = None
+    uc_disease_extent: Optional[UCExtent] = None
+    uc_severity: Optional[UCSeverity] = None
+    # --- Sequences ---
+    ra_failed_dmards: Tuple[DrugClass, ...] = ()
     # ... other relevant fields ...
 
+    def __post_init__(self):
+        object.__setattr__(self, "ra_failed_dmards", tuple(self.ra_failed_dmards))
+
+    def evolve(self, **changes: Any) -> "PatientData":
+        """Returns a copy with the given fields changed, e.g. after new results come back."""
+        return replace(self, **changes)
+
+# Structure-of-arrays counterpart of PatientData for running plans over whole cohorts.
+# Each field is one NumPy column with an entry per patient; scalars are broadcast to the cohort.
+# eq=False: arrays have no single truth value, so cohorts compare and hash by identity.
+@dataclass(slots=True, frozen=True, kw_only=True, eq=False)
+class PatientCohort:
+    # --- Stroke reperfusion inputs ---
+    time_since_onset_hours: "np.ndarray"
+    nihss_score: "np.ndarray"
+    bp_systolic: "np.ndarray"
+    bp_diastolic: "np.ndarray"
+    ct_shows_haemorrhage: "np.ndarray"
+    ct_shows_large_established_infarct: "np.ndarray"
+    thrombolysis_contraindicated: "np.ndarray"
+    thrombectomy_possible: "np.ndarray"
+    thrombectomy_target_vessel_present: "np.ndarray"
+    _DTYPES: ClassVar[Dict[str, str]] = {"time_since_onset_hours": "float64", "nihss_score": "int32", "bp_systolic": "int32", "bp_diastolic": "int32"} # Others are bool
+
+    def __post_init__(self):
+        _require_numpy()
+        names = [f.name for f in fields(self)]
+        # atleast_1d so an all-scalar cohort is one patient rather than 0-d arrays
+        columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(getattr(self, name), dtype=self._DTYPES.get(name, "bool"))) for name in names))
+        for name, column in zip(names, columns):
+            object.__setattr__(self, name, column)
+
+    def __len__(self) -> int: return self.time_since_onset_hours.shape[0]
+
+# --- Shared Recommendations ---
+# Recommendations are frozen, so constant ones are built once and shared by every plan.
+_DOAC_INTERIM = DrugRecommendation(name="Apixaban / Rivaroxaban", drug_class=DrugClass.DOAC, rationale="Offer interim therapeutic anticoagulation")
+_DOAC_START_INTERIM = DrugRecommendation(name="Apixaban / Rivaroxaban", drug_class=DrugClass.DOAC, rationale="Start interim anticoagulation")
+_DRUG_IV_HYDROCORT = DrugRecommendation(name="IV Hydrocortisone / Methylprednisolone")
+_INV_CTPA_IMMEDIATE = InvestigationRecommendation(investigation_type=InvestigationType.CTPA, urgency="Immediate")
+_INV_VQ_IMMEDIATE = InvestigationRecommendation(investigation_type=InvestigationType.VQ_SCAN, urgency="Immediate")
+_INV_DDIMER_IMMEDIATE = InvestigationRecommendation(investigation_type=InvestigationType.D_DIMER, urgency="Immediate")
+_INV_CT_HEAD = InvestigationRecommendation(investigation_type=InvestigationType.CT_HEAD_NON_CONTRAST, urgency="Immediate")
+_INV_CT_ANGIO = InvestigationRecommendation(investigation_type=InvestigationType.CT_ANGIOGRAM, urgency="Immediate")
+_ACT_ANTIBIOTICS_INDICATED = ActionRecommendation("Antibiotics indicated")
+_ACT_ANTIBIOTICS_NOT_INDICATED = ActionRecommendation("Antibiotics not routinely indicated")
+_ACT_NIV_INDICATED = ActionRecommendation("NIV Indicated")
+_ACT_VTE_LMWH = ActionRecommendation("Assess VTE risk + LMWH")
+
 # ---------------------------------------------
 # Section 3: Base Condition Class
 # ---------------------------------------------
 
 class MedicalCondition(ABC):
+    __slots__ = () # Conditions are stateless; instances need no __dict__
     name: str
     description: str
+    # One shared, immutable value per condition class; read directly or via the getters below
+    aetiology: ClassVar[Tuple[str, ...]]
+    risk_factors: ClassVar[RiskFactors]
+    signs_symptoms: ClassVar[Tuple[str, ...]]
+    complications: ClassVar[Tuple[str, ...]]
     @abstractmethod
     def get_definition(self) -> str: pass
     @abstractmethod
-    def get_aetiology(self) -> List[str]: pass
+    def get_aetiology(self) -> Tuple[str, ...]: pass
     @abstractmethod
     def get_risk_factors(self) -> RiskFactors: pass
     @abstractmethod
-    def get_signs_symptoms(self) -> List[str]: pass
+    def get_signs_symptoms(self) -> Tuple[str, ...]: pass
     @abstractmethod
-    def get_complications(self) -> List[str]: pass
+    def get_complications(self) -> Tuple[str, ...]: pass
+
+@lru_cache(maxsize=None)
+def get_condition(cls: Type[MedicalCondition]) -> MedicalCondition:
+    """Returns the shared instance of a condition class; conditions are stateless, so one per class suffices."""
+    return cls()
 
 # ---------------------------------------------
 # Section 4: Utility / Scoring Functions
 # ---------------------------------------------
 
 # --- Wells Score for PE ---
+# Indexed by (score > 4)
+_WELLS_PE_RISKS: Tuple[WellsScoreRiskPE, ...] = (WellsScoreRiskPE.PE_UNLIKELY, WellsScoreRiskPE.PE_LIKELY)
+
+def score_and_risk_wells_pe(
+    has_clinical_signs_dvt: bool, is_pe_most_likely_diagnosis: bool, heart_rate: int,
+    had_immobilisation_or_surgery_last_4_weeks: bool, has_previous_dvt_or_pe: bool,
+    has_haemoptysis: bool, has_malignancy: bool
+) -> Tuple[float, WellsScoreRiskPE]:
+    """Calculates the Wells score and its interpretation in a single call."""
+    score = (
+        (3.0 if has_clinical_signs_dvt else 0.0)
+        + (3.0 if is_pe_most_likely_diagnosis else 0.0)
+        + (1.5 if heart_rate > 100 else 0.0)
+        + (1.5 if had_immobilisation_or_surgery_last_4_weeks else 0.0)
+        + (1.5 if has_previous_dvt_or_pe else 0.0)
+        + (1.0 if has_haemoptysis else 0.0)
+        + (1.0 if has_malignancy else 0.0)
+    )
+    return score, _WELLS_PE_RISKS[bool(score > 4)]
+
 def calculate_wells_score_pe(
     has_clinical_signs_dvt: bool, is_pe_most_likely_diagnosis: bool, heart_rate: int,
     had_immobilisation_or_surgery_last_4_weeks: bool, has_previous_dvt_or_pe: bool,
     has_haemoptysis: bool, has_malignancy: bool
 ) -> float:
-    score = 0.0
-    if has_clinical_signs_dvt: score += 3.0
-    if is_pe_most_likely_diagnosis: score += 3.0
-    if heart_rate > 100: score += 1.5
-    if had_immobilisation_or_surgery_last_4_weeks: score += 1.5
-    if has_previous_dvt_or_pe: score += 1.5
-    if has_haemoptysis: score += 1.0
-    if has_malignancy: score += 1.0
-    return score
+    return score_and_risk_wells_pe(has_clinical_signs_dvt, is_pe_most_likely_diagnosis, heart_rate, had_immobilisation_or_surgery_last_4_weeks, has_previous_dvt_or_pe, has_haemoptysis, has_malignancy)[0]
 
 def interpret_wells_score_pe(score: float) -> WellsScoreRiskPE:
-     return WellsScoreRiskPE.PE_LIKELY if score > 4 else WellsScoreRiskPE.PE_UNLIKELY
+     return _WELLS_PE_RISKS[bool(score > 4)] # bool() so NumPy scalars from the batch scorers index too
 
 # --- Killip Class ---
+# Indexed by (shock << 3) | (pulmonary oedema << 2) | (crackles << 1) | S3 gallop; the most severe finding wins
+_KILLIP_TABLE: Tuple[KillipClass, ...] = tuple(
+    KillipClass.CLASS_IV if i & 0b1000 else
+    KillipClass.CLASS_III if i & 0b0100 else
+    KillipClass.CLASS_II if i & 0b0011 else
+    KillipClass.CLASS_I
+    for i in range(16)
+)
+
 def determine_killip_class(
     has_lung_crackles: bool, has_s3_gallop: bool, has_frank_pulmonary_oedema: bool, is_in_cardiogenic_shock: bool
 ) -> KillipClass:
-    if is_in_cardiogenic_shock: return KillipClass.CLASS_IV
-    if has_frank_pulmonary_oedema: return KillipClass.CLASS_III
-    if has_lung_crackles or has_s3_gallop: return KillipClass.CLASS_II
-    return KillipClass.CLASS_I
+    return _KILLIP_TABLE[
+        (bool(is_in_cardiogenic_shock) << 3) | (bool(has_frank_pulmonary_oedema) << 2)
+        | (bool(has_lung_crackles) << 1) | bool(has_s3_gallop)
+    ]
 
 # --- GRACE Score Placeholder ---
 def calculate_grace_score(
@@ -241,10 +436,15 @@ def calculate_grace_score(
     killip_class: KillipClass, had_cardiac_arrest: bool,
     has_st_deviation: bool, is_troponin_raised: bool
 ) -> Optional[int]:
-    print("Warning: GRACE score calculation logic is complex and not fully implemented here.")
+    logger.debug("GRACE score calculation logic is complex and not fully implemented here.")
     return None
 
 # --- DKA Severity ---
+# Lower bounds of the MODERATE and MILD bands for each marker
+_DKA_PH_THRESHOLDS: Tuple[float, ...] = (7.0, 7.3)
+_DKA_BICARBONATE_THRESHOLDS: Tuple[float, ...] = (5.0, 15.0)
+_DKA_LEVELS: Tuple[DKASeverity, ...] = (DKASeverity.SEVERE, DKASeverity.MODERATE, DKASeverity.MILD)
+
 def determine_dka_severity(
     ph_level: Optional[float],
     bicarbonate_mmol_l: Optional[float],
@@ -252,34 +452,34 @@ def determine_dka_severity(
 ) -> Optional[DKASeverity]:
     if ph_level is None or bicarbonate_mmol_l is None or blood_ketones_mmol_l is None:
         return None # Cannot determine severity
-    if ph_level < 7.0 or bicarbonate_mmol_l < 5.0:
-        return DKASeverity.SEVERE
-    elif ph_level < 7.3 or bicarbonate_mmol_l < 15.0:
-         # Assuming ketones > 3 already met for DKA diagnosis
-        return DKASeverity.MODERATE
-    else:
-        return DKASeverity.MILD
+    # The worse of pH and bicarbonate decides; assuming ketones > 3 already met for DKA diagnosis
+    return max(
+        _DKA_LEVELS[bisect_right(_DKA_PH_THRESHOLDS, ph_level)],
+        _DKA_LEVELS[bisect_right(_DKA_BICARBONATE_THRESHOLDS, bicarbonate_mmol_l)]
+    )
 
 # --- DAS28 Calculation Placeholder ---
 def calculate_das28(
     tender_joint_count_28: int, swollen_joint_count_28: int, esr_or_crp_value: float,
     patient_global_assessment_vas_100mm: int
 ) -> Optional[float]:
-    print("Warning: DAS28 calculation logic is complex and not implemented here.")
+    logger.debug("DAS28 calculation logic is complex and not implemented here.")
     return None
 
+# Upper bounds (inclusive) of the LOW and MODERATE bands
+_DAS28_THRESHOLDS: Tuple[float, ...] = (3.2, 5.1)
+_DAS28_LEVELS: Tuple[RAActivityLevel, ...] = (RAActivityLevel.LOW, RAActivityLevel.MODERATE, RAActivityLevel.HIGH)
+
 def interpret_das28(das28_score: Optional[float]) -> Optional[RAActivityLevel]:
-    if das28_score is None: return None
-    if das28_score <= 3.2: return RAActivityLevel.LOW
-    if das28_score <= 5.1: return RAActivityLevel.MODERATE
-    return RAActivityLevel.HIGH
+    if das28_score is None or das28_score != das28_score: return None # Missing or NaN, as in interpret_das28_batch
+    return _DAS28_LEVELS[bisect_left(_DAS28_THRESHOLDS, das28_score)]
 
 # --- UC Severity Placeholder ---
 def assess_uc_severity(
     stools_per_day: int, has_blood_in_stool: bool, temperature_celsius: float,
     heart_rate: int, haemoglobin_g_dl: float, esr_mm_hr: int
 ) -> UCSeverity:
-    print("Warning: UC severity assessment logic is simplified based on Truelove & Witts.")
+    logger.debug("UC severity assessment logic is simplified based on Truelove & Witts.")
     severe_criteria_count = 0
     if stools_per_day >= 6: severe_criteria_count += 1
     if has_blood_in_stool: severe_criteria_count += 1
@@ -291,6 +491,142 @@ def assess_uc_severity(
     if stools_per_day > 4: return UCSeverity.MODERATE
     return UCSeverity.MILD
 
+# --- Batch (Cohort) Scoring ---
+# Vectorised twins of the scorers above: each argument is an array with one entry per patient.
+# Categorical results are returned as arrays of enum values, e.g. UCSeverity(codes[i]).
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy is required for batch scoring functions (pip install numpy).")
+
+# Numba is optional and slow to import, so the JIT kernels are only built on the first batch call.
+# Without Numba the getters return None and the NumPy expressions are used instead.
+@lru_cache(maxsize=None)
+def _import_numba() -> Optional[Any]:
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba
+
+def _flatten_for_kernel(*columns: "np.ndarray") -> Tuple[Tuple[int, ...], List["np.ndarray"]]:
+    """Broadcasts the columns to one shape and flattens each into a 1-D array for a kernel.
+
+    Columns that need broadcasting are materialised with np.full, not passed as broadcast views,
+    which NumPy warns about when Numba inspects them.
+    """
+    shape = np.broadcast_shapes(*(column.shape for column in columns))
+    return shape, [(column if column.shape == shape else np.full(shape, column, dtype=column.dtype)).ravel() for column in columns]
+
+@lru_cache(maxsize=None)
+def _get_wells_kernel() -> Optional[Any]:
+    numba = _import_numba()
+    if numba is None: return None
+
+    @numba.njit(parallel=True, cache=True)
+    def _wells_pe_kernel(signs_dvt, pe_likely, hr, immob, prev, haemopt, malig, out):
+        for i in numba.prange(out.shape[0]):
+            out[i] = (
+                3.0 * signs_dvt[i] + 3.0 * pe_likely[i] + 1.5 * (hr[i] > 100)
+                + 1.5 * immob[i] + 1.5 * prev[i] + 1.0 * haemopt[i] + 1.0 * malig[i]
+            )
+    return _wells_pe_kernel
+
+@lru_cache(maxsize=None)
+def _get_uc_severity_kernel() -> Optional[Any]:
+    numba = _import_numba()
+    if numba is None: return None
+
+    @numba.njit(parallel=True, cache=True)
+    def _uc_severity_kernel(stools, blood, temp, hr, hb, esr, out):
+        for i in numba.prange(out.shape[0]):
+            count = (
+                (stools[i] >= 6) + blood[i] + (temp[i] > 37.8)
+                + (hr[i] > 90) + (hb[i] < 10.5) + (esr[i] > 30)
+            )
+            # Codes follow UCSeverity: MILD = 1, MODERATE = 2, SEVERE = 3
+            out[i] = 3 if count >= 2 else (2 if stools[i] > 4 else 1)
+    return _uc_severity_kernel
+
+def calculate_wells_score_pe_batch(
+    has_clinical_signs_dvt, is_pe_most_likely_diagnosis, heart_rate,
+    had_immobilisation_or_surgery_last_4_weeks, has_previous_dvt_or_pe,
+    has_haemoptysis, has_malignancy
+) -> "np.ndarray":
+    _require_numpy()
+    wells_pe_kernel = _get_wells_kernel()
+    if wells_pe_kernel is not None:
+        shape, (signs_dvt, pe_likely, immob, prev, haemopt, malig, hr) = _flatten_for_kernel(
+            *(np.asarray(flag, dtype=np.bool_) for flag in (
+                has_clinical_signs_dvt, is_pe_most_likely_diagnosis, had_immobilisation_or_surgery_last_4_weeks,
+                has_previous_dvt_or_pe, has_haemoptysis, has_malignancy
+            )),
+            np.asarray(heart_rate, dtype=np.float64)
+        )
+        out = np.empty(shape, dtype=np.float64)
+        wells_pe_kernel(signs_dvt, pe_likely, hr, immob, prev, haemopt, malig, out.reshape(-1))
+        return out
+    return (
+        3.0 * np.asarray(has_clinical_signs_dvt, dtype=bool)
+        + 3.0 * np.asarray(is_pe_most_likely_diagnosis, dtype=bool)
+        + 1.5 * (np.asarray(heart_rate) > 100)
+        + 1.5 * np.asarray(had_immobilisation_or_surgery_last_4_weeks, dtype=bool)
+        + 1.5 * np.asarray(has_previous_dvt_or_pe, dtype=bool)
+        + 1.0 * np.asarray(has_haemoptysis, dtype=bool)
+        + 1.0 * np.asarray(has_malignancy, dtype=bool)
+    )
+
+def determine_dka_severity_batch(ph_level, bicarbonate_mmol_l, blood_ketones_mmol_l) -> "np.ndarray":
+    """Returns DKASeverity values per patient; 0 where any input is missing (NaN)."""
+    _require_numpy()
+    ph = np.asarray(ph_level, dtype=np.float64)
+    bicarb = np.asarray(bicarbonate_mmol_l, dtype=np.float64)
+    ketones = np.asarray(blood_ketones_mmol_l, dtype=np.float64)
+    return np.select(
+        [np.isnan(ph) | np.isnan(bicarb) | np.isnan(ketones), (ph < 7.0) | (bicarb < 5.0), (ph < 7.3) | (bicarb < 15.0)],
+        [0, DKASeverity.SEVERE.value, DKASeverity.MODERATE.value],
+        default=DKASeverity.MILD.value
+    ).astype(np.int8) # Same dtype as the other categorical batch scorers
+
+def interpret_das28_batch(das28_score) -> "np.ndarray":
+    """Returns RAActivityLevel values per patient; 0 where the score is missing (NaN)."""
+    _require_numpy()
+    scores = np.asarray(das28_score, dtype=np.float64)
+    # side="left" keeps the band upper bounds inclusive, as in interpret_das28
+    levels = np.searchsorted(np.asarray(_DAS28_THRESHOLDS), scores, side="left").astype(np.int8) + 1
+    return np.where(np.isnan(scores), 0, levels)
+
+def assess_uc_severity_batch(
+    stools_per_day, has_blood_in_stool, temperature_celsius,
+    heart_rate, haemoglobin_g_dl, esr_mm_hr
+) -> "np.ndarray":
+    """Returns UCSeverity values per patient."""
+    _require_numpy()
+    logger.debug("UC severity assessment logic is simplified based on Truelove & Witts.")
+    uc_severity_kernel = _get_uc_severity_kernel()
+    if uc_severity_kernel is not None:
+        shape, (stools, blood, temp, hr, hb, esr) = _flatten_for_kernel(
+            np.asarray(stools_per_day, dtype=np.float64), np.asarray(has_blood_in_stool, dtype=np.bool_),
+            np.asarray(temperature_celsius, dtype=np.float64), np.asarray(heart_rate, dtype=np.float64),
+            np.asarray(haemoglobin_g_dl, dtype=np.float64), np.asarray(esr_mm_hr, dtype=np.float64)
+        )
+        out = np.empty(shape, dtype=np.int8)
+        uc_severity_kernel(stools, blood, temp, hr, hb, esr, out.reshape(-1))
+        return out
+    stools = np.asarray(stools_per_day)
+    severe_criteria_count = (
+        (stools >= 6).astype(np.int8)
+        + np.asarray(has_blood_in_stool, dtype=bool)
+        + (np.asarray(temperature_celsius) > 37.8)
+        + (np.asarray(heart_rate) > 90)
+        + (np.asarray(haemoglobin_g_dl) < 10.5)
+        + (np.asarray(esr_mm_hr) > 30)
+    )
+    return np.where(
+        severe_criteria_count >= 2, UCSeverity.SEVERE.value, # Simplified rule
+        np.where(stools > 4, UCSeverity.MODERATE.value, UCSeverity.MILD.value)
+    ).astype(np.int8) # Same dtype as the kernel output
+
 
 # ---------------------------------------------
 # Section 5: Condition Implementations
@@ -298,13 +634,26 @@ def assess_uc_severity(
 
 # --- Cardiology: ACS ---
 class AcuteCoronarySyndrome(MedicalCondition):
+    __slots__ = ()
     name = "Acute Coronary Syndrome"
     description = "Umbrella term: STEMI, NSTEMI, Unstable Angina."
+    aetiology = ("Coronary artery disease", "Plaque rupture")
+    risk_factors = RiskFactors(modifiable=("Smoking", "Hypertension", "Diabetes", "Obesity", "Hypercholesterolaemia"), non_modifiable=("Age", "Male sex", "Family history"))
+    signs_symptoms = ("Chest pain (crushing, radiating)", "Dyspnoea", "Sweating", "Nausea")
+    complications = ("Arrhythmias", "Heart failure", "Cardiogenic shock", "Rupture")
+    # Steps shared by every NSTEMI/UA plan; the risk strategy edge is patched per plan
+    _NSTEMI_STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        "INITIAL": AlgorithmStep(step_id="INITIAL", description="Initial Management (Aspirin, Fondaparinux/UFH, Anti-anginal)", default_next_step_id="RISK_STRAT"),
+        "RISK_STRAT": AlgorithmStep(step_id="RISK_STRAT", description="Risk Stratification (GRACE Score)"),
+        "INVASIVE": AlgorithmStep(step_id="INVASIVE", description="Intermediate/High Risk: Invasive Strategy", default_next_step_id="SECONDARY"),
+        "CONSERVATIVE": AlgorithmStep(step_id="CONSERVATIVE", description="Low Risk: Conservative Strategy", default_next_step_id="SECONDARY"),
+        "SECONDARY": AlgorithmStep(step_id="SECONDARY", description="Secondary Prevention"), # End step
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Coronary artery disease", "Plaque rupture"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(modifiable=["Smoking", "Hypertension", "Diabetes", "Obesity", "Hypercholesterolaemia"], non_modifiable=["Age", "Male sex", "Family history"])
-    def get_signs_symptoms(self) -> List[str]: return ["Chest pain (crushing, radiating)", "Dyspnoea", "Sweating", "Nausea"]
-    def get_complications(self) -> List[str]: return ["Arrhythmias", "Heart failure", "Cardiogenic shock", "Rupture"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def diagnose_acs_type(self, has_st_elevation: bool, is_troponin_raised: bool, has_st_depression_or_twi: bool, has_chest_pain_suspicious_for_acs: bool) -> Optional[ACSType]:
         if not has_chest_pain_suspicious_for_acs: return None
@@ -314,53 +663,55 @@ class AcuteCoronarySyndrome(MedicalCondition):
         return None
 
     def get_stemi_management_plan(self, symptom_onset_hours: float, hospital_can_pci_within_120m: bool) -> AlgorithmPlan:
-        # Implementation from previous example... (simplified for brevity)
-        plan = AlgorithmPlan(condition="STEMI", start_step_id="INITIAL")
-        steps = {}
-        steps["INITIAL"] = AlgorithmStep(step_id="INITIAL", description="Initial Management (MONA-B style)", default_next_step_id="REPERFUSION")
-        steps["REPERFUSION"] = AlgorithmStep(step_id="REPERFUSION", description="Reperfusion Strategy")
-        steps["PCI"] = AlgorithmStep(step_id="PCI", description="Primary PCI preferred", default_next_step_id="SECONDARY")
-        steps["LYSIS"] = AlgorithmStep(step_id="LYSIS", description="Fibrinolysis indicated", default_next_step_id="SECONDARY")
-        steps["LATE"] = AlgorithmStep(step_id="LATE", description="Late Presentation management", default_next_step_id="SECONDARY")
-        steps["SECONDARY"] = AlgorithmStep(step_id="SECONDARY", description="Secondary Prevention") # End step
-
-        if symptom_onset_hours <= 12 and hospital_can_pci_within_120m:
-            steps["REPERFUSION"].default_next_step_id = "PCI"
-        elif symptom_onset_hours <= 12:
-            steps["REPERFUSION"].default_next_step_id = "LYSIS"
-        else:
-            steps["REPERFUSION"].default_next_step_id = "LATE"
-
-        plan.steps = steps
-        return plan
+        # Only three distinct plans exist (PCI, lysis, late presentation); all are prebuilt at import
+        return _STEMI_PLANS[(0 if hospital_can_pci_within_120m else 1) if symptom_onset_hours <= 12 else 2]
 
     def get_nstemi_ua_management_plan(self, grace_score: Optional[int], high_bleeding_risk: bool) -> AlgorithmPlan:
+        # Unknown GRACE score is treated as high risk
+        return self._build_nstemi_ua_plan(grace_score is None or grace_score > 3)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _build_nstemi_ua_plan(cls, invasive: bool) -> AlgorithmPlan:
         # Implementation from previous example... (simplified for brevity)
-        plan = AlgorithmPlan(condition="NSTEMI/Unstable Angina", start_step_id="INITIAL")
-        steps = {}
-        steps["INITIAL"] = AlgorithmStep(step_id="INITIAL", description="Initial Management (Aspirin, Fondaparinux/UFH, Anti-anginal)", default_next_step_id="RISK_STRAT")
-        steps["RISK_STRAT"] = AlgorithmStep(step_id="RISK_STRAT", description="Risk Stratification (GRACE Score)")
-        steps["INVASIVE"] = AlgorithmStep(step_id="INVASIVE", description="Intermediate/High Risk: Invasive Strategy", default_next_step_id="SECONDARY")
-        steps["CONSERVATIVE"] = AlgorithmStep(step_id="CONSERVATIVE", description="Low Risk: Conservative Strategy", default_next_step_id="SECONDARY")
-        steps["SECONDARY"] = AlgorithmStep(step_id="SECONDARY", description="Secondary Prevention") # End step
-
-        if grace_score is None or grace_score > 3:
-            steps["RISK_STRAT"].default_next_step_id = "INVASIVE"
+        steps = cls._NSTEMI_STEP_TEMPLATE.copy()
+
+        if invasive:
+            steps["RISK_STRAT"] = replace(steps["RISK_STRAT"], default_next_step_id="INVASIVE")
         else:
-            steps["RISK_STRAT"].default_next_step_id = "CONSERVATIVE"
+            steps["RISK_STRAT"] = replace(steps["RISK_STRAT"], default_next_step_id="CONSERVATIVE")
 
-        plan.steps = steps
-        return plan
+        return AlgorithmPlan(condition="NSTEMI/Unstable Angina", start_step_id="INITIAL", steps=steps)
+
+def _build_stemi_plan(reperfusion_step_id: str) -> AlgorithmPlan:
+    """Builds the STEMI plan for one reperfusion strategy ("PCI", "LYSIS" or "LATE")."""
+    # Implementation from previous example... (simplified for brevity)
+    steps = {}
+    steps["INITIAL"] = AlgorithmStep(step_id="INITIAL", description="Initial Management (MONA-B style)", default_next_step_id="REPERFUSION")
+    steps["REPERFUSION"] = AlgorithmStep(step_id="REPERFUSION", description="Reperfusion Strategy", default_next_step_id=reperfusion_step_id)
+    steps["PCI"] = AlgorithmStep(step_id="PCI", description="Primary PCI preferred", default_next_step_id="SECONDARY")
+    steps["LYSIS"] = AlgorithmStep(step_id="LYSIS", description="Fibrinolysis indicated", default_next_step_id="SECONDARY")
+    steps["LATE"] = AlgorithmStep(step_id="LATE", description="Late Presentation management", default_next_step_id="SECONDARY")
+    steps["SECONDARY"] = AlgorithmStep(step_id="SECONDARY", description="Secondary Prevention") # End step
+    return AlgorithmPlan(condition="STEMI", start_step_id="INITIAL", steps=steps)
+
+# Indexed as: onset <= 12h with PCI available, onset <= 12h without PCI, late presentation
+_STEMI_PLANS: Tuple[AlgorithmPlan, ...] = tuple(_build_stemi_plan(step_id) for step_id in ("PCI", "LYSIS", "LATE"))
 
 # --- Vascular/Respiratory: PE ---
 class PulmonaryEmbolism(MedicalCondition):
+    __slots__ = ()
     name = "Pulmonary Embolism"
     description = "Obstruction of pulmonary arteries."
+    aetiology = ("Deep vein thrombosis (DVT)",)
+    risk_factors = RiskFactors(modifiable=("Immobility", "Surgery", "OCP/HRT"), non_modifiable=("Previous VTE", "Malignancy"))
+    signs_symptoms = ("Dyspnoea", "Pleuritic chest pain", "Tachypnoea", "Tachycardia")
+    complications = ("Right heart strain", "Collapse", "Death")
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Deep vein thrombosis (DVT)"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(modifiable=["Immobility", "Surgery", "OCP/HRT"], non_modifiable=["Previous VTE", "Malignancy"])
-    def get_signs_symptoms(self) -> List[str]: return ["Dyspnoea", "Pleuritic chest pain", "Tachypnoea", "Tachycardia"]
-    def get_complications(self) -> List[str]: return ["Right heart strain", "Collapse", "Death"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def get_investigation_management_plan(
         self, has_clinical_signs_dvt: bool, is_pe_most_likely_diagnosis: bool, heart_rate: int,
@@ -369,125 +720,167 @@ class PulmonaryEmbolism(MedicalCondition):
         ctpa_contraindicated: bool = False
     ) -> AlgorithmPlan:
         """Provides the investigation and initial management algorithm for suspected PE."""
-        plan = AlgorithmPlan(condition=self.name, start_step_id="ASSESS_RISK")
-        steps = {}
-
         # Calculate Wells score and risk
-        wells_score = calculate_wells_score_pe(has_clinical_signs_dvt, is_pe_most_likely_diagnosis, heart_rate, had_immobilisation_or_surgery_last_4_weeks, has_previous_dvt_or_pe, has_haemoptysis, has_malignancy)
-        pe_risk = interpret_wells_score_pe(wells_score)
-
-        # Step 1: Assess Risk
-        steps["ASSESS_RISK"] = AlgorithmStep(step_id="ASSESS_RISK", description="Assess Pre-test Probability (Wells Score)", details=f"Score: {wells_score}, Risk: {pe_risk.name}")
-        steps["ASSESS_RISK"].conditional_next_step_ids = {
-            WellsScoreRiskPE.PE_LIKELY.name: "PE_LIKELY_PATH",
-            WellsScoreRiskPE.PE_UNLIKELY.name: "PE_UNLIKELY_PATH"
-        }
-
-        # --- PE Likely Pathway ---
-        steps["PE_LIKELY_PATH"] = AlgorithmStep(step_id="PE_LIKELY_PATH", description="PE Likely Pathway (Wells > 4)")
-        steps["PE_LIKELY_PATH"].drug_recommendations.append(DrugRecommendation(name="Apixaban / Rivaroxaban", drug_class=DrugClass.DOAC, rationale="Offer interim therapeutic anticoagulation"))
-        if ctpa_contraindicated or is_renal_impaired:
-            steps["PE_LIKELY_PATH"].investigation_recommendations.append(InvestigationRecommendation(investigation_type=InvestigationType.VQ_SCAN, urgency="Immediate"))
-        else:
-            steps["PE_LIKELY_PATH"].investigation_recommendations.append(InvestigationRecommendation(investigation_type=InvestigationType.CTPA, urgency="Immediate"))
-        steps["PE_LIKELY_PATH"].default_next_step_id = "AWAIT_IMAGING_LIKELY" # Wait for results
-
-        steps["AWAIT_IMAGING_LIKELY"] = AlgorithmStep(step_id="AWAIT_IMAGING_LIKELY", description="Await Imaging Result")
-        steps["AWAIT_IMAGING_LIKELY"].conditional_next_step_ids = {
+        wells_score, pe_risk = score_and_risk_wells_pe(has_clinical_signs_dvt, is_pe_most_likely_diagnosis, heart_rate, had_immobilisation_or_surgery_last_4_weeks, has_previous_dvt_or_pe, has_haemoptysis, has_malignancy)
+
+        # Plan structure only depends on the imaging modality and risk; patch in the patient's score
+        template = _PE_PLAN_TEMPLATES[(bool(ctpa_contraindicated or is_renal_impaired), pe_risk)]
+        assess_risk = replace(template.steps[0], details=f"Score: {wells_score}, Risk: {pe_risk.name}")
+        return replace(template, steps=(assess_risk,) + template.steps[1:])
+
+# --- PE End States (shared by every PE plan) ---
+_PE_END_STEPS = {
+    "PE_CONFIRMED": AlgorithmStep(step_id="PE_CONFIRMED", description="PE Confirmed", final_diagnosis_recommendation="PE Confirmed. Continue/Start therapeutic anticoagulation."),
+    "PE_RULED_OUT": AlgorithmStep(step_id="PE_RULED_OUT", description="PE Ruled Out", stop_condition="PE Ruled Out. Stop anticoagulation. Consider alternative diagnoses."),
+    "PE_RULED_OUT_CONSIDER_DVT": AlgorithmStep(step_id="PE_RULED_OUT_CONSIDER_DVT", description="PE Ruled Out, Consider DVT", stop_condition="PE Ruled Out based on imaging. Stop anticoagulation. Consider proximal leg vein ultrasound if DVT suspected despite negative imaging."),
+}
+
+def _build_pe_likely_branch(imaging: InvestigationRecommendation) -> Dict[str, AlgorithmStep]:
+    """Steps of the PE Likely pathway (Wells > 4)."""
+    return {
+        "PE_LIKELY_PATH": AlgorithmStep(
+            step_id="PE_LIKELY_PATH", description="PE Likely Pathway (Wells > 4)",
+            drug_recommendations=(_DOAC_INTERIM,),
+            investigation_recommendations=(imaging,),
+            default_next_step_id="AWAIT_IMAGING_LIKELY" # Wait for results
+        ),
+        "AWAIT_IMAGING_LIKELY": AlgorithmStep(step_id="AWAIT_IMAGING_LIKELY", description="Await Imaging Result", conditional_next_step_ids={
             "IMAGING_POSITIVE": "PE_CONFIRMED",
             "IMAGING_NEGATIVE": "PE_RULED_OUT_CONSIDER_DVT"
-        }
-
-        # --- PE Unlikely Pathway ---
-        steps["PE_UNLIKELY_PATH"] = AlgorithmStep(step_id="PE_UNLIKELY_PATH", description="PE Unlikely Pathway (Wells <= 4)")
-        steps["PE_UNLIKELY_PATH"].investigation_recommendations.append(InvestigationRecommendation(investigation_type=InvestigationType.D_DIMER, urgency="Immediate"))
-        steps["PE_UNLIKELY_PATH"].default_next_step_id = "AWAIT_DDIMER"
-
-        steps["AWAIT_DDIMER"] = AlgorithmStep(step_id="AWAIT_DDIMER", description="Await D-Dimer Result")
-        steps["AWAIT_DDIMER"].conditional_next_step_ids = {
+        }),
+    }
+
+def _build_pe_unlikely_branch(imaging: InvestigationRecommendation) -> Dict[str, AlgorithmStep]:
+    """Steps of the PE Unlikely pathway (Wells <= 4), via D-dimer."""
+    return {
+        "PE_UNLIKELY_PATH": AlgorithmStep(
+            step_id="PE_UNLIKELY_PATH", description="PE Unlikely Pathway (Wells <= 4)",
+            investigation_recommendations=(_INV_DDIMER_IMMEDIATE,),
+            default_next_step_id="AWAIT_DDIMER"
+        ),
+        "AWAIT_DDIMER": AlgorithmStep(step_id="AWAIT_DDIMER", description="Await D-Dimer Result", conditional_next_step_ids={
             "D-Dimer Positive": "DDIMER_POS_PATH",
             "D-Dimer Negative": "PE_RULED_OUT"
-        }
-
-        steps["DDIMER_POS_PATH"] = AlgorithmStep(step_id="DDIMER_POS_PATH", description="D-Dimer Positive - Proceed as PE Likely", drug_recommendations=[DrugRecommendation(name="Apixaban / Rivaroxaban", drug_class=DrugClass.DOAC, rationale="Start interim anticoagulation")])
-        # Re-use imaging recommendations from PE Likely path
-        if ctpa_contraindicated or is_renal_impaired:
-            steps["DDIMER_POS_PATH"].investigation_recommendations.append(InvestigationRecommendation(investigation_type=InvestigationType.VQ_SCAN, urgency="Immediate"))
-        else:
-             steps["DDIMER_POS_PATH"].investigation_recommendations.append(InvestigationRecommendation(investigation_type=InvestigationType.CTPA, urgency="Immediate"))
-        steps["DDIMER_POS_PATH"].default_next_step_id = "AWAIT_IMAGING_UNLIKELY" # Wait for results
-
-        steps["AWAIT_IMAGING_UNLIKELY"] = AlgorithmStep(step_id="AWAIT_IMAGING_UNLIKELY", description="Await Imaging Result (after positive D-Dimer)")
-        steps["AWAIT_IMAGING_UNLIKELY"].conditional_next_step_ids = {
+        }),
+        "DDIMER_POS_PATH": AlgorithmStep(
+            step_id="DDIMER_POS_PATH", description="D-Dimer Positive - Proceed as PE Likely",
+            drug_recommendations=(_DOAC_START_INTERIM,),
+            # Re-use imaging recommendations from PE Likely path
+            investigation_recommendations=(imaging,),
+            default_next_step_id="AWAIT_IMAGING_UNLIKELY" # Wait for results
+        ),
+        "AWAIT_IMAGING_UNLIKELY": AlgorithmStep(step_id="AWAIT_IMAGING_UNLIKELY", description="Await Imaging Result (after positive D-Dimer)", conditional_next_step_ids={
              "IMAGING_POSITIVE": "PE_CONFIRMED",
              "IMAGING_NEGATIVE": "PE_RULED_OUT_CONSIDER_DVT" # May need DVT scan
-        }
-
-        # --- End States ---
-        steps["PE_CONFIRMED"] = AlgorithmStep(step_id="PE_CONFIRMED", description="PE Confirmed", final_diagnosis_recommendation="PE Confirmed. Continue/Start therapeutic anticoagulation.")
-        steps["PE_RULED_OUT"] = AlgorithmStep(step_id="PE_RULED_OUT", description="PE Ruled Out", stop_condition="PE Ruled Out. Stop anticoagulation. Consider alternative diagnoses.")
-        steps["PE_RULED_OUT_CONSIDER_DVT"] = AlgorithmStep(step_id="PE_RULED_OUT_CONSIDER_DVT", description="PE Ruled Out, Consider DVT", stop_condition="PE Ruled Out based on imaging. Stop anticoagulation. Consider proximal leg vein ultrasound if DVT suspected despite negative imaging.")
-
-        plan.steps = steps
-        return plan
+        }),
+    }
+
+def _build_pe_templates() -> Dict[Tuple[bool, WellsScoreRiskPE], AlgorithmPlan]:
+    """Builds the PE plan skeletons, keyed by (V/Q scan replaces CTPA, Wells risk).
+
+    Each skeleton only holds the pathway reachable for its risk, plus the shared end states.
+    """
+    templates = {}
+    for use_vq_scan in (False, True):
+        imaging = _INV_VQ_IMMEDIATE if use_vq_scan else _INV_CTPA_IMMEDIATE
+        branches = (
+            (WellsScoreRiskPE.PE_LIKELY, "PE_LIKELY_PATH", _build_pe_likely_branch(imaging)),
+            (WellsScoreRiskPE.PE_UNLIKELY, "PE_UNLIKELY_PATH", _build_pe_unlikely_branch(imaging)),
+        )
+        for pe_risk, path_step_id, branch in branches:
+            # Step 1: Assess Risk
+            steps = {"ASSESS_RISK": AlgorithmStep(step_id="ASSESS_RISK", description="Assess Pre-test Probability (Wells Score)", conditional_next_step_ids={
+                pe_risk.name: path_step_id
+            })}
+            steps.update(branch)
+            steps.update(_PE_END_STEPS)
+            templates[(use_vq_scan, pe_risk)] = AlgorithmPlan(condition=PulmonaryEmbolism.name, start_step_id="ASSESS_RISK", steps=steps)
+    return templates
+
+_PE_PLAN_TEMPLATES = _build_pe_templates()
 
 # --- Respiratory: Acute Exacerbation of COPD ---
 class AcuteExacerbationCOPD(MedicalCondition):
     # ... (Static methods like get_definition, get_aetiology etc. remain the same) ...
+    __slots__ = ()
     name = "Acute Exacerbation of COPD"
     description = "Acute worsening of respiratory symptoms requiring change in regular medication."
+    aetiology = ("Infection (Bacterial/Viral)", "Pollution", "Non-adherence")
+    risk_factors = RiskFactors(modifiable=("Smoking",), non_modifiable=("Alpha-1 antitrypsin def.", "Age"))
+    signs_symptoms = ("Increased dyspnoea", "Increased cough", "Sputum change", "Wheeze")
+    complications = ("Respiratory failure", "Pneumonia", "Cor pulmonale")
+    # Steps shared by every COPD plan; antibiotic and NIV decisions are patched per plan
+    _STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        "INITIAL_ASSESSMENT": AlgorithmStep(step_id="INITIAL_ASSESSMENT", description="Initial Assessment & Oxygen Therapy", default_next_step_id="BRONCHODILATORS"),
+        "BRONCHODILATORS": AlgorithmStep(step_id="BRONCHODILATORS", description="Bronchodilator Therapy (Nebulised SABA + SAMA)", default_next_step_id="STEROIDS"),
+        "STEROIDS": AlgorithmStep(step_id="STEROIDS", description="Corticosteroid Therapy (Oral/IV)", default_next_step_id="ANTIBIOTICS"),
+        "ANTIBIOTICS": AlgorithmStep(step_id="ANTIBIOTICS", description="Antibiotic Therapy", default_next_step_id="ASSESS_NIV"),
+        "ASSESS_NIV": AlgorithmStep(step_id="ASSESS_NIV", description="Assess Need for NIV based on ABG"),
+        "CONSIDER_ICU": AlgorithmStep(step_id="CONSIDER_ICU", description="Consider Invasive Ventilation/ICU"),
+        "CONTINUE_MEDICAL": AlgorithmStep(step_id="CONTINUE_MEDICAL", description="Continue Medical Management"), # End step (simplified)
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Infection (Bacterial/Viral)", "Pollution", "Non-adherence"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(modifiable=["Smoking"], non_modifiable=["Alpha-1 antitrypsin def.", "Age"])
-    def get_signs_symptoms(self) -> List[str]: return ["Increased dyspnoea", "Increased cough", "Sputum change", "Wheeze"]
-    def get_complications(self) -> List[str]: return ["Respiratory failure", "Pneumonia", "Cor pulmonale"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def get_management_plan(
         self, oxygen_saturation: Optional[float], sputum_purulent: bool,
         resp_acidosis_present: Optional[bool], ph_level: Optional[float]
     ) -> AlgorithmPlan:
         """Provides management algorithm for Acute Exacerbation of COPD."""
+        # pH only matters in the presence of respiratory acidosis: <7.25 -> ICU, [7.25, 7.35) -> NIV
+        ph_band = None
+        if resp_acidosis_present and ph_level is not None:
+            ph_band = 0 if ph_level < 7.25 else 1 if ph_level < 7.35 else 2
+        return self._build_management_plan(bool(sputum_purulent), ph_band)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _build_management_plan(cls, sputum_purulent: bool, ph_band: Optional[int]) -> AlgorithmPlan:
         # Implementation from previous example... (simplified for brevity)
-        plan = AlgorithmPlan(condition=self.name, start_step_id="INITIAL_ASSESSMENT")
-        steps = {}
-        steps["INITIAL_ASSESSMENT"] = AlgorithmStep(step_id="INITIAL_ASSESSMENT", description="Initial Assessment & Oxygen Therapy", default_next_step_id="BRONCHODILATORS")
-        steps["BRONCHODILATORS"] = AlgorithmStep(step_id="BRONCHODILATORS", description="Bronchodilator Therapy (Nebulised SABA + SAMA)", default_next_step_id="STEROIDS")
-        steps["STEROIDS"] = AlgorithmStep(step_id="STEROIDS", description="Corticosteroid Therapy (Oral/IV)", default_next_step_id="ANTIBIOTICS")
-        steps["ANTIBIOTICS"] = AlgorithmStep(step_id="ANTIBIOTICS", description="Antibiotic Therapy")
-        steps["ASSESS_NIV"] = AlgorithmStep(step_id="ASSESS_NIV", description="Assess Need for NIV based on ABG")
-        steps["CONSIDER_ICU"] = AlgorithmStep(step_id="CONSIDER_ICU", description="Consider Invasive Ventilation/ICU")
-        steps["CONTINUE_MEDICAL"] = AlgorithmStep(step_id="CONTINUE_MEDICAL", description="Continue Medical Management") # End step (simplified)
+        steps = cls._STEP_TEMPLATE.copy()
 
         if sputum_purulent:
-            steps["ANTIBIOTICS"].recommended_actions.append(ActionRecommendation("Antibiotics indicated"))
+            steps["ANTIBIOTICS"] = replace(steps["ANTIBIOTICS"], recommended_actions=(_ACT_ANTIBIOTICS_INDICATED,))
         else:
-            steps["ANTIBIOTICS"].recommended_actions.append(ActionRecommendation("Antibiotics not routinely indicated"))
-        steps["ANTIBIOTICS"].default_next_step_id = "ASSESS_NIV"
+            steps["ANTIBIOTICS"] = replace(steps["ANTIBIOTICS"], recommended_actions=(_ACT_ANTIBIOTICS_NOT_INDICATED,))
 
-        if resp_acidosis_present and ph_level is not None:
-            if 7.25 <= ph_level < 7.35:
-                steps["ASSESS_NIV"].recommended_actions.append(ActionRecommendation("NIV Indicated"))
-                steps["ASSESS_NIV"].default_next_step_id = "CONTINUE_MEDICAL" # Assume NIV started elsewhere
-            elif ph_level < 7.25:
-                steps["ASSESS_NIV"].default_next_step_id = "CONSIDER_ICU"
-            else: # pH >= 7.35
-                steps["ASSESS_NIV"].default_next_step_id = "CONTINUE_MEDICAL"
-        else: # No acidosis or pH unknown
-            steps["ASSESS_NIV"].default_next_step_id = "CONTINUE_MEDICAL"
-
-        plan.steps = steps
-        return plan
+        if ph_band == 1:
+            steps["ASSESS_NIV"] = replace(steps["ASSESS_NIV"], recommended_actions=(_ACT_NIV_INDICATED,), default_next_step_id="CONTINUE_MEDICAL") # Assume NIV started elsewhere
+        elif ph_band == 0:
+            steps["ASSESS_NIV"] = replace(steps["ASSESS_NIV"], default_next_step_id="CONSIDER_ICU")
+        else: # pH >= 7.35, no acidosis or pH unknown
+            steps["ASSESS_NIV"] = replace(steps["ASSESS_NIV"], default_next_step_id="CONTINUE_MEDICAL")
+
+        return AlgorithmPlan(condition=cls.name, start_step_id="INITIAL_ASSESSMENT", steps=steps)
 
 # --- Endocrinology: Diabetic Ketoacidosis (DKA) ---
 class DiabeticKetoacidosis(MedicalCondition):
     # ... (Static methods like get_definition, get_aetiology etc. remain the same) ...
+    __slots__ = ()
     name = "Diabetic Ketoacidosis (DKA)"
     description = "Life-threatening complication of diabetes."
+    aetiology = ("Missed insulin", "Infection", "New T1DM")
+    risk_factors = RiskFactors(non_modifiable=("Type 1 Diabetes",))
+    signs_symptoms = ("Polyuria/Polydipsia", "Nausea/Vomiting", "Abdo pain", "Kussmaul breathing", "Acetone breath")
+    complications = ("Cerebral oedema", "Hypokalaemia", "ARDS", "Thromboembolism")
+    # Steps shared by every DKA plan; potassium warnings are patched per plan
+    _STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        "CONFIRM_INITIAL": AlgorithmStep(step_id="CONFIRM_INITIAL", description="Confirmation and Initial Actions", default_next_step_id="FLUIDS"),
+        "FLUIDS": AlgorithmStep(step_id="FLUIDS", description="IV Fluid Replacement", default_next_step_id="INSULIN"),
+        "INSULIN": AlgorithmStep(step_id="INSULIN", description="Insulin Therapy (FRIII)", default_next_step_id="POTASSIUM"),
+        "POTASSIUM": AlgorithmStep(step_id="POTASSIUM", description="Potassium Replacement (based on initial K+)", default_next_step_id="MONITOR_RESOLVE"),
+        # Resolution logic placeholder: assume resolution criteria met
+        "MONITOR_RESOLVE": AlgorithmStep(step_id="MONITOR_RESOLVE", description="Monitoring and DKA Resolution", default_next_step_id="TRANSITION"),
+        "TRANSITION": AlgorithmStep(step_id="TRANSITION", description="Transition to Subcutaneous Insulin"), # End step
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Missed insulin", "Infection", "New T1DM"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(non_modifiable=["Type 1 Diabetes"])
-    def get_signs_symptoms(self) -> List[str]: return ["Polyuria/Polydipsia", "Nausea/Vomiting", "Abdo pain", "Kussmaul breathing", "Acetone breath"]
-    def get_complications(self) -> List[str]: return ["Cerebral oedema", "Hypokalaemia", "ARDS", "Thromboembolism"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def get_management_plan(
         self, weight_kg: float, blood_glucose_mmol_l: float, ph_level: float,
@@ -495,41 +888,53 @@ class DiabeticKetoacidosis(MedicalCondition):
         systolic_bp: int
     ) -> AlgorithmPlan:
         """Provides management algorithm for DKA based on UK guidelines (JBDS)."""
+        # Only the initial potassium currently changes the plan
+        return self._build_management_plan(potassium_mmol_l < 3.5)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _build_management_plan(cls, severe_hypokalaemia: bool) -> AlgorithmPlan:
         # Implementation from previous example... (simplified for brevity)
-        plan = AlgorithmPlan(condition=self.name, start_step_id="CONFIRM_INITIAL")
-        steps = {}
-        steps["CONFIRM_INITIAL"] = AlgorithmStep(step_id="CONFIRM_INITIAL", description="Confirmation and Initial Actions", default_next_step_id="FLUIDS")
-        steps["FLUIDS"] = AlgorithmStep(step_id="FLUIDS", description="IV Fluid Replacement", default_next_step_id="INSULIN")
-        steps["INSULIN"] = AlgorithmStep(step_id="INSULIN", description="Insulin Therapy (FRIII)", default_next_step_id="POTASSIUM")
-        steps["POTASSIUM"] = AlgorithmStep(step_id="POTASSIUM", description="Potassium Replacement (based on initial K+)")
-        steps["MONITOR_RESOLVE"] = AlgorithmStep(step_id="MONITOR_RESOLVE", description="Monitoring and DKA Resolution")
-        steps["TRANSITION"] = AlgorithmStep(step_id="TRANSITION", description="Transition to Subcutaneous Insulin") # End step
+        steps = cls._STEP_TEMPLATE.copy()
 
         # Basic Potassium logic linking
-        if potassium_mmol_l < 3.5:
-             steps["POTASSIUM"].warnings.append("SEVERE HYPOKALAEMIA - Seek senior help BEFORE starting insulin")
-             steps["POTASSIUM"].default_next_step_id = "MONITOR_RESOLVE"
-        elif 3.5 <= potassium_mmol_l <= 5.5:
-             steps["POTASSIUM"].default_next_step_id = "MONITOR_RESOLVE"
-        else: # > 5.5
-             steps["POTASSIUM"].default_next_step_id = "MONITOR_RESOLVE"
-
-        # Resolution logic placeholder
-        steps["MONITOR_RESOLVE"].default_next_step_id = "TRANSITION" # Assume resolution criteria met
+        if severe_hypokalaemia:
+             steps["POTASSIUM"] = replace(steps["POTASSIUM"], warnings=("SEVERE HYPOKALAEMIA - Seek senior help BEFORE starting insulin",))
 
-        plan.steps = steps
-        return plan
+        return AlgorithmPlan(condition=cls.name, start_step_id="CONFIRM_INITIAL", steps=steps)
 
 # --- Rheumatology: RA Management (already implemented with complexity) ---
 class RheumatoidArthritis(MedicalCondition):
     # Implementation from previous example...
+    __slots__ = ()
     name = "Rheumatoid Arthritis"
     description = "Chronic autoimmune disease causing joint inflammation."
+    aetiology = ("Autoimmune", "Genetics", "Environment")
+    risk_factors = RiskFactors(modifiable=("Smoking",), non_modifiable=("Female sex", "Family history"))
+    signs_symptoms = ("Symmetrical polyarthritis", "Morning stiffness")
+    complications = ("Joint destruction", "Vasculitis", "Lung disease")
+    # Steps shared by every RA plan; builders copy this and patch the input-dependent edges
+    _STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        "START": AlgorithmStep(step_id="START", description="Initial Diagnosis/Assessment", default_next_step_id="FIRST_LINE_DMARD"),
+        "FIRST_LINE_DMARD": AlgorithmStep(step_id="FIRST_LINE_DMARD", description="Initiate First-Line Conventional DMARD", default_next_step_id="ASSESS_RESPONSE_DMARD"),
+        # Simplified conditional logic for demonstration
+        "ASSESS_RESPONSE_DMARD": AlgorithmStep(step_id="ASSESS_RESPONSE_DMARD", description="Assess Response after ~3-6 months", conditional_next_step_ids={
+             _RA_HIGH: "CONSIDER_BIOLOGIC",
+             _RA_MOD: "OPTIMIZE_DMARD",
+             _RA_LOW: "CONTINUE_MONITOR"
+        }, default_next_step_id="CONTINUE_MONITOR"),
+        "OPTIMIZE_DMARD": AlgorithmStep(step_id="OPTIMIZE_DMARD", description="Optimize/Switch Conventional DMARDs", default_next_step_id="ASSESS_RESPONSE_DMARD"),
+        "CONSIDER_BIOLOGIC": AlgorithmStep(step_id="CONSIDER_BIOLOGIC", description="Consider Biologic/Targeted Synthetic DMARD Therapy"),
+        "ADD_ANTI_TNF": AlgorithmStep(step_id="ADD_ANTI_TNF", description="Add Anti-TNF Biologic", default_next_step_id="ASSESS_RESPONSE_BIOLOGIC"),
+        "SWITCH_BIOLOGIC": AlgorithmStep(step_id="SWITCH_BIOLOGIC", description="Switch Biologic or JAK inhibitor", default_next_step_id="ASSESS_RESPONSE_BIOLOGIC"),
+        "ASSESS_RESPONSE_BIOLOGIC": AlgorithmStep(step_id="ASSESS_RESPONSE_BIOLOGIC", description="Assess Response to Biologic/tsDMARD", default_next_step_id="CONTINUE_MONITOR"),
+        "CONTINUE_MONITOR": AlgorithmStep(step_id="CONTINUE_MONITOR", description="Continue Current Therapy and Monitor"),
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Autoimmune", "Genetics", "Environment"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(modifiable=["Smoking"], non_modifiable=["Female sex", "Family history"])
-    def get_signs_symptoms(self) -> List[str]: return ["Symmetrical polyarthritis", "Morning stiffness"]
-    def get_complications(self) -> List[str]: return ["Joint destruction", "Vasculitis", "Lung disease"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def get_management_plan(
         self, das28_score: Optional[float], failed_conventional_dmards: int,
@@ -537,55 +942,98 @@ class RheumatoidArthritis(MedicalCondition):
         has_active_infection: bool, has_severe_heart_failure_for_tnfi: bool,
         patient_preference_biologic: bool = True
     ) -> AlgorithmPlan:
-        # Implementation from previous example...
-        plan = AlgorithmPlan(condition=self.name, start_step_id="START")
-        steps = {}
-        steps["START"] = AlgorithmStep(step_id="START", description="Initial Diagnosis/Assessment", default_next_step_id="FIRST_LINE_DMARD")
-        steps["FIRST_LINE_DMARD"] = AlgorithmStep(step_id="FIRST_LINE_DMARD", description="Initiate First-Line Conventional DMARD", default_next_step_id="ASSESS_RESPONSE_DMARD")
-        steps["ASSESS_RESPONSE_DMARD"] = AlgorithmStep(step_id="ASSESS_RESPONSE_DMARD", description="Assess Response after ~3-6 months")
-        steps["OPTIMIZE_DMARD"] = AlgorithmStep(step_id="OPTIMIZE_DMARD", description="Optimize/Switch Conventional DMARDs", default_next_step_id="ASSESS_RESPONSE_DMARD")
-        steps["CONSIDER_BIOLOGIC"] = AlgorithmStep(step_id="CONSIDER_BIOLOGIC", description="Consider Biologic/Targeted Synthetic DMARD Therapy")
-        steps["ADD_ANTI_TNF"] = AlgorithmStep(step_id="ADD_ANTI_TNF", description="Add Anti-TNF Biologic", default_next_step_id="ASSESS_RESPONSE_BIOLOGIC")
-        steps["SWITCH_BIOLOGIC"] = AlgorithmStep(step_id="SWITCH_BIOLOGIC", description="Switch Biologic or JAK inhibitor", default_next_step_id="ASSESS_RESPONSE_BIOLOGIC")
-        steps["ASSESS_RESPONSE_BIOLOGIC"] = AlgorithmStep(step_id="ASSESS_RESPONSE_BIOLOGIC", description="Assess Response to Biologic/tsDMARD", default_next_step_id="CONTINUE_MONITOR")
-        steps["CONTINUE_MONITOR"] = AlgorithmStep(step_id="CONTINUE_MONITOR", description="Continue Current Therapy and Monitor")
-
-        # Simplified conditional logic for demonstration
-        activity_level = interpret_das28(das28_score)
-        steps["ASSESS_RESPONSE_DMARD"].conditional_next_step_ids = {
-             RAActivityLevel.HIGH.name: "CONSIDER_BIOLOGIC",
-             RAActivityLevel.MODERATE.name: "OPTIMIZE_DMARD",
-             RAActivityLevel.LOW.name: "CONTINUE_MONITOR"
-        }
-        steps["ASSESS_RESPONSE_DMARD"].default_next_step_id = "CONTINUE_MONITOR"
-
         can_start_biologic = tb_screening_done_and_negative and not has_active_infection
         eligibility_met = (das28_score or 0) > 5.1 and failed_conventional_dmards >= 2
+        return self._build_management_plan(bool(eligibility_met and can_start_biologic), failed_biologic_tnfi, has_severe_heart_failure_for_tnfi)
 
-        if eligibility_met and can_start_biologic:
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _build_management_plan(cls, biologic_indicated: bool, failed_biologic_tnfi: bool, has_severe_heart_failure_for_tnfi: bool) -> AlgorithmPlan:
+        # Implementation from previous example...
+        steps = cls._STEP_TEMPLATE.copy()
+
+        if biologic_indicated:
             if failed_biologic_tnfi:
-                 steps["CONSIDER_BIOLOGIC"].default_next_step_id = "SWITCH_BIOLOGIC"
+                 steps["CONSIDER_BIOLOGIC"] = replace(steps["CONSIDER_BIOLOGIC"], default_next_step_id="SWITCH_BIOLOGIC")
             elif not has_severe_heart_failure_for_tnfi:
-                 steps["CONSIDER_BIOLOGIC"].default_next_step_id = "ADD_ANTI_TNF"
+                 steps["CONSIDER_BIOLOGIC"] = replace(steps["CONSIDER_BIOLOGIC"], default_next_step_id="ADD_ANTI_TNF")
             else: # Severe HF is contraindication for Anti-TNF
-                 steps["CONSIDER_BIOLOGIC"].warnings.append("Anti-TNF contraindicated due to severe HF. Consider alternative biologic/JAKi.")
-                 steps["CONSIDER_BIOLOGIC"].default_next_step_id = "SWITCH_BIOLOGIC" # Assume switch path if anti-TNF CI
+                 steps["CONSIDER_BIOLOGIC"] = replace(steps["CONSIDER_BIOLOGIC"], warnings=("Anti-TNF contraindicated due to severe HF. Consider alternative biologic/JAKi.",), default_next_step_id="SWITCH_BIOLOGIC") # Assume switch path if anti-TNF CI
         else:
-             steps["CONSIDER_BIOLOGIC"].default_next_step_id = "OPTIMIZE_DMARD" # Not eligible or unsafe for biologic
+             steps["CONSIDER_BIOLOGIC"] = replace(steps["CONSIDER_BIOLOGIC"], default_next_step_id="OPTIMIZE_DMARD") # Not eligible or unsafe for biologic
 
-        plan.steps = steps
-        return plan
+        return AlgorithmPlan(condition=cls.name, start_step_id="START", steps=steps)
 
 # --- Gastroenterology: Ulcerative Colitis Induction (already implemented with complexity) ---
 class UlcerativeColitis(MedicalCondition):
     # Implementation from previous example...
+    __slots__ = ()
     name = "Ulcerative Colitis"
     description = "Chronic inflammatory bowel disease affecting colon/rectum."
+    aetiology = ("Unknown",)
+    risk_factors = RiskFactors(non_modifiable=("Family history", "Ethnicity"))
+    signs_symptoms = ("Bloody diarrhoea", "Urgency", "Tenesmus")
+    complications = ("Toxic megacolon", "Perforation", "Cancer")
+    # Steps shared by every remission plan (START is per severity/extent); edges are patched per plan
+    _STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        # Maintenance step placeholder
+        "CONSIDER_MAINTENANCE": AlgorithmStep(step_id="CONSIDER_MAINTENANCE", description="Remission Achieved - Consider Maintenance Therapy"),
+    }
+    # Steps of each treatment pathway; a plan only includes the pathway it can reach
+    _PATHWAY_STEPS: ClassVar[Dict[str, Dict[str, AlgorithmStep]]] = {
+        # Severe pathway steps
+        "SEVERE": {
+            "ADMIT_SEVERE": AlgorithmStep(step_id="ADMIT_SEVERE", description="Admit to hospital for Severe UC", recommended_actions=(_ACT_VTE_LMWH,)),
+            "IV_STEROIDS": AlgorithmStep(step_id="IV_STEROIDS", description="IV Corticosteroids", drug_recommendations=(_DRUG_IV_HYDROCORT,), default_next_step_id="ASSESS_RESPONSE_SEVERE"),
+            "ASSESS_RESPONSE_SEVERE": AlgorithmStep(step_id="ASSESS_RESPONSE_SEVERE", description="Assess response after 72 hours"),
+            "SWITCH_ORAL_STEROIDS": AlgorithmStep(step_id="SWITCH_ORAL_STEROIDS", description="Switch to Oral Steroids", default_next_step_id="CONSIDER_MAINTENANCE"),
+            "SECOND_LINE_SEVERE": AlgorithmStep(step_id="SECOND_LINE_SEVERE", description="Add IV Ciclosporin OR Biologic (Infliximab)", default_next_step_id="ASSESS_RESPONSE_RESCUE"),
+            "ASSESS_RESPONSE_RESCUE": AlgorithmStep(step_id="ASSESS_RESPONSE_RESCUE", description="Assess response to rescue therapy (4-7 days)"),
+            "SURGERY_COLECTOMY": AlgorithmStep(step_id="SURGERY_COLECTOMY", description="Consider Colectomy"),
+        },
+        # --- Mild/Moderate Steps ---
+        "PROCTITIS": {
+            "TOPICAL_ASA_PROCTITIS": AlgorithmStep(step_id="TOPICAL_ASA_PROCTITIS", description="Topical 5-ASA (Suppository)", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_1"),
+            "ASSESS_RESPONSE_PROCTITIS_1": AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_1", description="Assess Proctitis response (4 weeks)"),
+            "ADD_ORAL_ASA_PROCTITIS": AlgorithmStep(step_id="ADD_ORAL_ASA_PROCTITIS", description="Add Oral 5-ASA to Topical 5-ASA", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_2"),
+            "ASSESS_RESPONSE_PROCTITIS_2": AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_2", description="Assess Proctitis response (4 weeks)"),
+            "ADD_TOPICAL_STEROID_PROCTITIS": AlgorithmStep(step_id="ADD_TOPICAL_STEROID_PROCTITIS", description="Add Topical Steroid (or switch Oral 5-ASA to Oral Steroid)", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_3"),
+            "ASSESS_RESPONSE_PROCTITIS_3": AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_3", description="Assess Proctitis response (4 weeks)"), # -> Refer if fails?
+        },
+        "LEFT_EXT": {
+            "TOPICAL_ASA_LEFTEXT": AlgorithmStep(step_id="TOPICAL_ASA_LEFTEXT", description="Topical 5-ASA (Enema)", default_next_step_id="ADD_ORAL_ASA_LEFTEXT"),
+            "ADD_ORAL_ASA_LEFTEXT": AlgorithmStep(step_id="ADD_ORAL_ASA_LEFTEXT", description="Add High-Dose Oral 5-ASA", default_next_step_id="ASSESS_RESPONSE_LEFTEXT_1"),
+            "ASSESS_RESPONSE_LEFTEXT_1": AlgorithmStep(step_id="ASSESS_RESPONSE_LEFTEXT_1", description="Assess Left-Sided/Extensive response (4 weeks)"),
+            "ADD_ORAL_STEROID_LEFTEXT": AlgorithmStep(step_id="ADD_ORAL_STEROID_LEFTEXT", description="Add Oral Corticosteroid", default_next_step_id="ASSESS_RESPONSE_LEFTEXT_2"),
+            "ASSESS_RESPONSE_LEFTEXT_2": AlgorithmStep(step_id="ASSESS_RESPONSE_LEFTEXT_2", description="Assess Left-Sided/Extensive response (4 weeks)"), # -> Refer if fails?
+        },
+    }
+    # (severity, extent key) -> {step ID: (default next, conditional next)}; every extent other than
+    # proctitis follows the left-sided/extensive pathway
+    _EDGE_PATCHES: ClassVar[Dict[Tuple[UCSeverity, str], Dict[str, Tuple[Optional[str], Optional[Dict[str, str]]]]]] = {
+        **dict.fromkeys([(UCSeverity.SEVERE, "PROCTITIS"), (UCSeverity.SEVERE, "LEFT_EXT")], {
+            "START": ("ADMIT_SEVERE", None),
+            "ADMIT_SEVERE": ("IV_STEROIDS", None),
+            "ASSESS_RESPONSE_SEVERE": (None, {"IMPROVED": "SWITCH_ORAL_STEROIDS", "NO_IMPROVEMENT": "SECOND_LINE_SEVERE"}),
+            "ASSESS_RESPONSE_RESCUE": (None, {"IMPROVED": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "SURGERY_COLECTOMY"}),
+        }),
+        **dict.fromkeys([(UCSeverity.MILD, "PROCTITIS"), (UCSeverity.MODERATE, "PROCTITIS")], {
+            "START": ("TOPICAL_ASA_PROCTITIS", None),
+            "ASSESS_RESPONSE_PROCTITIS_1": (None, {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_ORAL_ASA_PROCTITIS"}),
+            "ASSESS_RESPONSE_PROCTITIS_2": (None, {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_TOPICAL_STEROID_PROCTITIS"}),
+            "ASSESS_RESPONSE_PROCTITIS_3": (None, {"REMISSION": "CONSIDER_MAINTENANCE"}), # Add failure -> referral path
+        }),
+        **dict.fromkeys([(UCSeverity.MILD, "LEFT_EXT"), (UCSeverity.MODERATE, "LEFT_EXT")], {
+            "START": ("TOPICAL_ASA_LEFTEXT", None),
+            "ASSESS_RESPONSE_LEFTEXT_1": (None, {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_ORAL_STEROID_LEFTEXT"}),
+            "ASSESS_RESPONSE_LEFTEXT_2": (None, {"REMISSION": "CONSIDER_MAINTENANCE"}), # Add failure -> referral path
+        }),
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Unknown"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(non_modifiable=["Family history", "Ethnicity"])
-    def get_signs_symptoms(self) -> List[str]: return ["Bloody diarrhoea", "Urgency", "Tenesmus"]
-    def get_complications(self) -> List[str]: return ["Toxic megacolon", "Perforation", "Cancer"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def induce_remission_plan(
         self, disease_extent: UCExtent, severity: UCSeverity,
@@ -594,66 +1042,55 @@ class UlcerativeColitis(MedicalCondition):
         response_to_last_step: Optional[BooleanStatus] = None
     ) -> AlgorithmPlan:
         """Generates plan for inducing remission in Ulcerative Colitis."""
-        plan = AlgorithmPlan(condition=f"{self.name} - Induce Remission ({severity.name}, {disease_extent.name})", start_step_id="START")
-        steps = {}
+        return _PRECOMPUTED_UC_PLANS[(severity, disease_extent)]
 
+    @classmethod
+    def _build_remission_plan(cls, disease_extent: UCExtent, severity: UCSeverity) -> AlgorithmPlan:
         # --- Define Steps ---
-        steps["START"] = AlgorithmStep(step_id="START", description=f"Initial treatment for {severity.name} {disease_extent.name}")
-        # Maintenance step placeholder
-        steps["CONSIDER_MAINTENANCE"] = AlgorithmStep(step_id="CONSIDER_MAINTENANCE", description="Remission Achieved - Consider Maintenance Therapy")
-        # Severe pathway steps
-        steps["ADMIT_SEVERE"] = AlgorithmStep(step_id="ADMIT_SEVERE", description="Admit to hospital for Severe UC", recommended_actions=[ActionRecommendation("Assess VTE risk + LMWH")])
-        steps["IV_STEROIDS"] = AlgorithmStep(step_id="IV_STEROIDS", description="IV Corticosteroids", drug_recommendations=[DrugRecommendation(name="IV Hydrocortisone / Methylprednisolone")], default_next_step_id="ASSESS_RESPONSE_SEVERE")
-        steps["ASSESS_RESPONSE_SEVERE"] = AlgorithmStep(step_id="ASSESS_RESPONSE_SEVERE", description="Assess response after 72 hours")
-        steps["SWITCH_ORAL_STEROIDS"] = AlgorithmStep(step_id="SWITCH_ORAL_STEROIDS", description="Switch to Oral Steroids", default_next_step_id="CONSIDER_MAINTENANCE")
-        steps["SECOND_LINE_SEVERE"] = AlgorithmStep(step_id="SECOND_LINE_SEVERE", description="Add IV Ciclosporin OR Biologic (Infliximab)", default_next_step_id="ASSESS_RESPONSE_RESCUE")
-        steps["ASSESS_RESPONSE_RESCUE"] = AlgorithmStep(step_id="ASSESS_RESPONSE_RESCUE", description="Assess response to rescue therapy (4-7 days)")
-        steps["SURGERY_COLECTOMY"] = AlgorithmStep(step_id="SURGERY_COLECTOMY", description="Consider Colectomy")
-
-        # --- Mild/Moderate Steps ---
-        steps["TOPICAL_ASA_PROCTITIS"] = AlgorithmStep(step_id="TOPICAL_ASA_PROCTITIS", description="Topical 5-ASA (Suppository)", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_1")
-        steps["ASSESS_RESPONSE_PROCTITIS_1"] = AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_1", description="Assess Proctitis response (4 weeks)")
-        steps["ADD_ORAL_ASA_PROCTITIS"] = AlgorithmStep(step_id="ADD_ORAL_ASA_PROCTITIS", description="Add Oral 5-ASA to Topical 5-ASA", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_2")
-        steps["ASSESS_RESPONSE_PROCTITIS_2"] = AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_2", description="Assess Proctitis response (4 weeks)")
-        steps["ADD_TOPICAL_STEROID_PROCTITIS"] = AlgorithmStep(step_id="ADD_TOPICAL_STEROID_PROCTITIS", description="Add Topical Steroid (or switch Oral 5-ASA to Oral Steroid)", default_next_step_id="ASSESS_RESPONSE_PROCTITIS_3")
-        steps["ASSESS_RESPONSE_PROCTITIS_3"] = AlgorithmStep(step_id="ASSESS_RESPONSE_PROCTITIS_3", description="Assess Proctitis response (4 weeks)") # -> Refer if fails?
-
-        steps["TOPICAL_ASA_LEFTEXT"] = AlgorithmStep(step_id="TOPICAL_ASA_LEFTEXT", description="Topical 5-ASA (Enema)", default_next_step_id="ADD_ORAL_ASA_LEFTEXT")
-        steps["ADD_ORAL_ASA_LEFTEXT"] = AlgorithmStep(step_id="ADD_ORAL_ASA_LEFTEXT", description="Add High-Dose Oral 5-ASA", default_next_step_id="ASSESS_RESPONSE_LEFTEXT_1")
-        steps["ASSESS_RESPONSE_LEFTEXT_1"] = AlgorithmStep(step_id="ASSESS_RESPONSE_LEFTEXT_1", description="Assess Left-Sided/Extensive response (4 weeks)")
-        steps["ADD_ORAL_STEROID_LEFTEXT"] = AlgorithmStep(step_id="ADD_ORAL_STEROID_LEFTEXT", description="Add Oral Corticosteroid", default_next_step_id="ASSESS_RESPONSE_LEFTEXT_2")
-        steps["ASSESS_RESPONSE_LEFTEXT_2"] = AlgorithmStep(step_id="ASSESS_RESPONSE_LEFTEXT_2", description="Assess Left-Sided/Extensive response (4 weeks)") # -> Refer if fails?
+        extent_key = "PROCTITIS" if disease_extent is UCExtent.PROCTITIS else "LEFT_EXT"
+        steps = {"START": AlgorithmStep(step_id="START", description=f"Initial treatment for {severity.name} {disease_extent.name}")}
+        steps.update(cls._STEP_TEMPLATE)
+        steps.update(cls._PATHWAY_STEPS["SEVERE" if severity is UCSeverity.SEVERE else extent_key])
 
         # --- Branching Logic from START ---
-        if severity == UCSeverity.SEVERE:
-             steps["START"].default_next_step_id = "ADMIT_SEVERE"
-             steps["ADMIT_SEVERE"].default_next_step_id = "IV_STEROIDS"
-             steps["ASSESS_RESPONSE_SEVERE"].conditional_next_step_ids = {"IMPROVED": "SWITCH_ORAL_STEROIDS", "NO_IMPROVEMENT": "SECOND_LINE_SEVERE"}
-             steps["ASSESS_RESPONSE_RESCUE"].conditional_next_step_ids = {"IMPROVED": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "SURGERY_COLECTOMY"}
-        elif severity in [UCSeverity.MILD, UCSeverity.MODERATE]:
-            if disease_extent == UCExtent.PROCTITIS:
-                steps["START"].default_next_step_id = "TOPICAL_ASA_PROCTITIS"
-                steps["ASSESS_RESPONSE_PROCTITIS_1"].conditional_next_step_ids = {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_ORAL_ASA_PROCTITIS"}
-                steps["ASSESS_RESPONSE_PROCTITIS_2"].conditional_next_step_ids = {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_TOPICAL_STEROID_PROCTITIS"}
-                steps["ASSESS_RESPONSE_PROCTITIS_3"].conditional_next_step_ids = {"REMISSION": "CONSIDER_MAINTENANCE"} # Add failure -> referral path
-            else: # Left-sided / Extensive
-                steps["START"].default_next_step_id = "TOPICAL_ASA_LEFTEXT"
-                steps["ASSESS_RESPONSE_LEFTEXT_1"].conditional_next_step_ids = {"REMISSION": "CONSIDER_MAINTENANCE", "NO_RESPONSE": "ADD_ORAL_STEROID_LEFTEXT"}
-                steps["ASSESS_RESPONSE_LEFTEXT_2"].conditional_next_step_ids = {"REMISSION": "CONSIDER_MAINTENANCE"} # Add failure -> referral path
-
-        plan.steps = steps
-        return plan
+        for step_id, (default_next, conditional_next) in cls._EDGE_PATCHES[(severity, extent_key)].items():
+            steps[step_id] = replace(steps[step_id], default_next_step_id=default_next, conditional_next_step_ids=conditional_next)
+
+        return AlgorithmPlan(condition=f"{cls.name} - Induce Remission ({severity.name}, {disease_extent.name})", start_step_id="START", steps=steps)
+
+# Every (severity, extent) combination is small enough to build once at import
+_PRECOMPUTED_UC_PLANS: Dict[Tuple[UCSeverity, UCExtent], AlgorithmPlan] = {
+    (severity, extent): UlcerativeColitis._build_remission_plan(extent, severity) for severity in UCSeverity for extent in UCExtent
+}
 
 # --- Neurology: Acute Ischaemic Stroke Reperfusion (already implemented with complexity) ---
 class AcuteIschaemicStroke(MedicalCondition):
     # Implementation from previous example...
+    __slots__ = ()
     name = "Acute Ischaemic Stroke"
     description = "Sudden neurological deficit from focal cerebral ischaemia."
+    aetiology = ("Thrombosis", "Embolism", "Small vessel disease")
+    risk_factors = RiskFactors(modifiable=("Hypertension", "Smoking", "Diabetes", "AF"), non_modifiable=("Age", "Family history"))
+    signs_symptoms = ("Unilateral weakness", "Facial droop", "Dysphasia", "Visual defects")
+    complications = ("Haemorrhagic transformation", "Cerebral oedema", "Aspiration")
+    # Steps shared by every reperfusion plan; eligibility edges are patched per plan
+    _STEP_TEMPLATE: ClassVar[Dict[str, AlgorithmStep]] = {
+        "START": AlgorithmStep(step_id="START", description="Assess Reperfusion Eligibility", investigation_recommendations=(_INV_CT_HEAD, _INV_CT_ANGIO), default_next_step_id="CHECK_HAEMORRHAGE"),
+        "CHECK_HAEMORRHAGE": AlgorithmStep(step_id="CHECK_HAEMORRHAGE", description="Check for Intracranial Haemorrhage (ICH)", conditional_next_step_ids={"ICH_PRESENT": "MANAGE_HAEMORRHAGE", "ICH_ABSENT": "CHECK_THROMBOLYSIS_TIME"}),
+        "MANAGE_HAEMORRHAGE": AlgorithmStep(step_id="MANAGE_HAEMORRHAGE", description="Manage Haemorrhagic Stroke"), # End state
+        "CHECK_THROMBOLYSIS_TIME": AlgorithmStep(step_id="CHECK_THROMBOLYSIS_TIME", description="Assess Thrombolysis Eligibility (Time < 4.5 hours?)"),
+        "CHECK_THROMBOLYSIS_CONTRA": AlgorithmStep(step_id="CHECK_THROMBOLYSIS_CONTRA", description="Check Thrombolysis Contraindications"),
+        "OFFER_THROMBOLYSIS": AlgorithmStep(step_id="OFFER_THROMBOLYSIS", description="Offer IV Thrombolysis (Alteplase)", default_next_step_id="CHECK_THROMBECTOMY_TIME"),
+        "CHECK_THROMBECTOMY_TIME": AlgorithmStep(step_id="CHECK_THROMBECTOMY_TIME", description="Assess Thrombectomy Eligibility (Time/Target Vessel?)"),
+        "OFFER_THROMBECTOMY": AlgorithmStep(step_id="OFFER_THROMBECTOMY", description="Offer Mechanical Thrombectomy", default_next_step_id="POST_REPERFUSION_CARE"),
+        "NO_REPERFUSION": AlgorithmStep(step_id="NO_REPERFUSION", description="No Acute Reperfusion Therapy Indicated"), # End state
+        "POST_REPERFUSION_CARE": AlgorithmStep(step_id="POST_REPERFUSION_CARE", description="Post-Reperfusion Care"), # End state
+    }
     def get_definition(self) -> str: return self.description
-    def get_aetiology(self) -> List[str]: return ["Thrombosis", "Embolism", "Small vessel disease"]
-    def get_risk_factors(self) -> RiskFactors: return RiskFactors(modifiable=["Hypertension", "Smoking", "Diabetes", "AF"], non_modifiable=["Age", "Family history"])
-    def get_signs_symptoms(self) -> List[str]: return ["Unilateral weakness", "Facial droop", "Dysphasia", "Visual defects"]
-    def get_complications(self) -> List[str]: return ["Haemorrhagic transformation", "Cerebral oedema", "Aspiration"]
+    def get_aetiology(self) -> Tuple[str, ...]: return self.aetiology
+    def get_risk_factors(self) -> RiskFactors: return self.risk_factors
+    def get_signs_symptoms(self) -> Tuple[str, ...]: return self.signs_symptoms
+    def get_complications(self) -> Tuple[str, ...]: return self.complications
 
     def get_reperfusion_plan(
         self, time_since_onset_hours: float, nihss_score: int, bp_systolic: int, bp_diastolic: int,
@@ -662,192 +1099,220 @@ class AcuteIschaemicStroke(MedicalCondition):
         thrombectomy_target_vessel_present: bool
     ) -> AlgorithmPlan:
         """Determines eligibility for thrombolysis and/or thrombectomy."""
-        plan = AlgorithmPlan(condition=f"{self.name} - Reperfusion", start_step_id="START")
-        steps = {}
-
-        steps["START"] = AlgorithmStep(step_id="START", description="Assess Reperfusion Eligibility", investigation_recommendations=[InvestigationRecommendation(InvestigationType.CT_HEAD_NON_CONTRAST, urgency="Immediate"), InvestigationRecommendation(InvestigationType.CT_ANGIOGRAM, urgency="Immediate")], default_next_step_id="CHECK_HAEMORRHAGE")
-        steps["CHECK_HAEMORRHAGE"] = AlgorithmStep(step_id="CHECK_HAEMORRHAGE", description="Check for Intracranial Haemorrhage (ICH)")
-        steps["MANAGE_HAEMORRHAGE"] = AlgorithmStep(step_id="MANAGE_HAEMORRHAGE", description="Manage Haemorrhagic Stroke") # End state
-        steps["CHECK_THROMBOLYSIS_TIME"] = AlgorithmStep(step_id="CHECK_THROMBOLYSIS_TIME", description="Assess Thrombolysis Eligibility (Time < 4.5 hours?)")
-        steps["CHECK_THROMBOLYSIS_CONTRA"] = AlgorithmStep(step_id="CHECK_THROMBOLYSIS_CONTRA", description="Check Thrombolysis Contraindications")
-        steps["OFFER_THROMBOLYSIS"] = AlgorithmStep(step_id="OFFER_THROMBOLYSIS", description="Offer IV Thrombolysis (Alteplase)", default_next_step_id="CHECK_THROMBECTOMY_TIME")
-        steps["CHECK_THROMBECTOMY_TIME"] = AlgorithmStep(step_id="CHECK_THROMBECTOMY_TIME", description="Assess Thrombectomy Eligibility (Time/Target Vessel?)")
-        steps["OFFER_THROMBECTOMY"] = AlgorithmStep(step_id="OFFER_THROMBECTOMY", description="Offer Mechanical Thrombectomy", default_next_step_id="POST_REPERFUSION_CARE")
-        steps["NO_REPERFUSION"] = AlgorithmStep(step_id="NO_REPERFUSION", description="No Acute Reperfusion Therapy Indicated") # End state
-        steps["POST_REPERFUSION_CARE"] = AlgorithmStep(step_id="POST_REPERFUSION_CARE", description="Post-Reperfusion Care") # End state
+        # Haemorrhage is a branch within the plan; NIHSS and BP don't change it yet
+        return _PRECOMPUTED_STROKE_PLANS[
+            ((time_since_onset_hours <= 4.5) << 2)
+            | (bool(thrombolysis_contraindicated or ct_shows_large_established_infarct) << 1)
+            | bool(time_since_onset_hours <= 24 and thrombectomy_possible and thrombectomy_target_vessel_present)
+        ]
+
+    def classify_reperfusion_pathway(self, cohort: PatientCohort) -> "np.ndarray":
+        """Returns each patient's index into the prebuilt reperfusion plans, using the same rules as get_reperfusion_plan."""
+        onset = cohort.time_since_onset_hours
+        return (
+            ((onset <= 4.5).astype(np.int8) << 2)
+            | ((cohort.thrombolysis_contraindicated | cohort.ct_shows_large_established_infarct).astype(np.int8) << 1)
+            | ((onset <= 24) & cohort.thrombectomy_possible & cohort.thrombectomy_target_vessel_present)
+        )
+
+    def get_reperfusion_plans(self, cohort: PatientCohort) -> List[AlgorithmPlan]:
+        """Cohort version of get_reperfusion_plan; patients in the same pathway share one plan."""
+        return [_PRECOMPUTED_STROKE_PLANS[i] for i in self.classify_reperfusion_pathway(cohort).tolist()]
+
+    @classmethod
+    def _build_reperfusion_plan(cls, within_thrombolysis_window: bool, thrombolysis_excluded: bool, thrombectomy_eligible: bool) -> AlgorithmPlan:
+        steps = cls._STEP_TEMPLATE.copy()
 
         # Define branching logic
-        steps["CHECK_HAEMORRHAGE"].conditional_next_step_ids = {"ICH_PRESENT": "MANAGE_HAEMORRHAGE", "ICH_ABSENT": "CHECK_THROMBOLYSIS_TIME"}
-        if time_since_onset_hours <= 4.5:
-            steps["CHECK_THROMBOLYSIS_TIME"].default_next_step_id = "CHECK_THROMBOLYSIS_CONTRA"
+        if within_thrombolysis_window:
+            steps["CHECK_THROMBOLYSIS_TIME"] = replace(steps["CHECK_THROMBOLYSIS_TIME"], default_next_step_id="CHECK_THROMBOLYSIS_CONTRA")
         else:
-            steps["CHECK_THROMBOLYSIS_TIME"].default_next_step_id = "CHECK_THROMBECTOMY_TIME" # Skip lysis check
+            steps["CHECK_THROMBOLYSIS_TIME"] = replace(steps["CHECK_THROMBOLYSIS_TIME"], default_next_step_id="CHECK_THROMBECTOMY_TIME") # Skip lysis check
 
-        if thrombolysis_contraindicated or ct_shows_large_established_infarct:
-            steps["CHECK_THROMBOLYSIS_CONTRA"].default_next_step_id = "CHECK_THROMBECTOMY_TIME"
+        if thrombolysis_excluded:
+            steps["CHECK_THROMBOLYSIS_CONTRA"] = replace(steps["CHECK_THROMBOLYSIS_CONTRA"], default_next_step_id="CHECK_THROMBECTOMY_TIME")
         else:
-            steps["CHECK_THROMBOLYSIS_CONTRA"].default_next_step_id = "OFFER_THROMBOLYSIS"
+            steps["CHECK_THROMBOLYSIS_CONTRA"] = replace(steps["CHECK_THROMBOLYSIS_CONTRA"], default_next_step_id="OFFER_THROMBOLYSIS")
 
         # Simplified thrombectomy time/criteria check
-        if time_since_onset_hours <= 24 and thrombectomy_possible and thrombectomy_target_vessel_present:
-             steps["CHECK_THROMBECTOMY_TIME"].default_next_step_id = "OFFER_THROMBECTOMY"
+        if thrombectomy_eligible:
+             steps["CHECK_THROMBECTOMY_TIME"] = replace(steps["CHECK_THROMBECTOMY_TIME"], default_next_step_id="OFFER_THROMBECTOMY")
         else:
-             steps["CHECK_THROMBECTOMY_TIME"].default_next_step_id = "NO_REPERFUSION"
+             steps["CHECK_THROMBECTOMY_TIME"] = replace(steps["CHECK_THROMBECTOMY_TIME"], default_next_step_id="NO_REPERFUSION")
 
-        plan.steps = steps
-        return plan
+        return AlgorithmPlan(condition=f"{cls.name} - Reperfusion", start_step_id="START", steps=steps)
+
+# Indexed by bit-packed flags: (within thrombolysis window << 2) | (thrombolysis excluded << 1) | thrombectomy eligible
+_PRECOMPUTED_STROKE_PLANS: Tuple[AlgorithmPlan, ...] = tuple(
+    AcuteIschaemicStroke._build_reperfusion_plan(*flags) for flags in itertools.product((False, True), repeat=3)
+)
 
 # ---------------------------------------------
 # Section 6: Example Usage (Conceptual - showing some of the classes)
 # ---------------------------------------------
 
-# --- Data Setup ---
-print("--- Setting up Example Patient Contexts ---")
-# ACS Patient
-patient_acs = PatientData(age=55, sex=Sex.MALE, is_troponin_raised=True, has_st_elevation=True, has_chest_pain_suspicious_for_acs=True)
-# PE Patient
-patient_pe = PatientData(has_clinical_signs_dvt=True, is_pe_most_likely_diagnosis=False, heart_rate=105, had_immobilisation_or_surgery_last_4_weeks=False, has_previous_dvt_or_pe=True, has_haemoptysis=False, has_malignancy=False, is_renal_impaired=False)
-# COPD Patient
-patient_copd = PatientData(oxygen_saturation=90.0, sputum_purulent=True, resp_acidosis_present=True, ph_level=7.28)
-# DKA Patient
-patient_dka = PatientData(weight_kg=70.0, blood_glucose_mmol_l=30.0, ph_level=7.1, bicarbonate_mmol_l=10.0, blood_ketones_mmol_l=5.0, potassium_mmol_l=3.8, systolic_bp=100)
-# RA Patient
-patient_ra = PatientData(ra_das28_score=5.5, failed_conventional_dmards=2, failed_biologic_tnfi=False, tb_screening_done_and_negative=True, has_active_infection=False, has_severe_heart_failure_for_tnfi=False)
-# UC Patient
-patient_uc = PatientData(uc_disease_extent=UCExtent.LEFT_SIDED_COLITIS, uc_severity=UCSeverity.MODERATE)
-# Stroke Patient
-patient_stroke = PatientData(stroke_symptom_onset_hours=3.0, stroke_nihss_score=15, stroke_bp_systolic=170, stroke_bp_diastolic=90, ct_shows_haemorrhage=False, ct_shows_large_established_infarct=False, thrombolysis_contraindicated=False, thrombectomy_possible=True, thrombectomy_target_vessel_present=True)
-
-# --- Instantiating Handlers ---
-print("--- Instantiating Condition Handlers ---")
-acs_handler = AcuteCoronarySyndrome()
-pe_handler = PulmonaryEmbolism()
-copd_handler = AcuteExacerbationCOPD() # Assumes class exists
-dka_handler = DiabeticKetoacidosis() # Assumes class exists
-ra_handler = RheumatoidArthritis()
-uc_handler = UlcerativeColitis() # Assumes class exists
-stroke_handler = AcuteIschaemicStroke() # Assumes class exists
-
 # --- Function to Print Plan (Simplified Navigation) ---
 def print_plan_path(plan: AlgorithmPlan):
-    print(f"\n--- Plan for: {plan.condition} ---")
-    current_step_id = plan.start_step_id
-    step_count = 0
+    # Lines are collected and written once rather than print()ed one by one
+    out: List[str] = [f"\n--- Plan for: {plan.condition} ---"]
     max_steps_to_print = 6 # Limit output length
-
-    while current_step_id and step_count < max_steps_to_print:
-        step = plan.steps.get(current_step_id)
-        if not step:
-            print(f"Error: Step ID '{current_step_id}' not found in plan.")
-            break
-
-        print(f"\nStep {step_count+1} ({step.step_id}): {step.description}")
-        if step.details: print(f"  Details: {step.details}")
+    path = plan.default_path
+    if plan.default_path_loop_start is not None and len(path) < max_steps_to_print:
+        loop = path[plan.default_path_loop_start:] # Keep going round the cycle up to the limit
+        path += loop * -(-(max_steps_to_print - len(path)) // len(loop))
+    path = path[:max_steps_to_print]
+
+    for step_count, step in enumerate(path):
+        out.append(f"\nStep {step_count+1} ({step.step_id}): {step.description}")
+        flags = step.render_flags
+        if flags & _RENDER_DETAILS: out.append(f"  Details: {step.details}")
         # ... (add printing for actions, investigations, drugs, warnings) ...
-        if step.drug_recommendations:
-            print("  Drugs:")
-            for drug in step.drug_recommendations: print(f"    - {drug.name}")
+        if flags & _RENDER_DRUGS:
+            out.append("  Drugs:")
+            out.extend(f"    - {drug.name}" for drug in step.drug_recommendations)
 
 
         # Simplified navigation: just follow default path for demonstration
-        next_step_id = step.default_next_step_id
-        if not next_step_id and not step.conditional_next_step_ids:
-            print("  (End of this path)")
+        if flags & _RENDER_END_OF_PATH:
+            out.append("  (End of this path)")
             break
-
-        current_step_id = next_step_id
-        step_count += 1
-    if step_count == max_steps_to_print:
-        print("  ...")
-
-
-# --- Generating and Printing Plans ---
-
-# ACS Plan
-print("\n--- Generating ACS Plan ---")
-acs_type = acs_handler.diagnose_acs_type(
-    has_st_elevation=patient_acs.has_st_elevation or False,
-    is_troponin_raised=patient_acs.is_troponin_raised or False,
-    has_st_depression_or_twi=patient_acs.has_st_depression_or_twi or False,
-    has_chest_pain_suspicious_for_acs=patient_acs.has_chest_pain_suspicious_for_acs or False
-)
-if acs_type == ACSType.STEMI:
-    acs_plan = acs_handler.get_stemi_management_plan(patient_acs.symptom_onset_hours_acs or 1.0, True) # Assume PCI available
-    print_plan_path(acs_plan)
-elif acs_type in [ACSType.NSTEMI, ACSType.UNSTABLE_ANGINA]:
-    # Need GRACE score calculated (using placeholder function)
-    grace_score = calculate_grace_score(patient_acs.age or 55, patient_acs.heart_rate or 90, patient_acs.systolic_bp or 140, patient_acs.creatinine_umol_l or 90, patient_acs.killip_class or KillipClass.CLASS_I, patient_acs.had_cardiac_arrest or False, patient_acs.has_st_depression_or_twi or False, patient_acs.is_troponin_raised or False)
-    acs_plan = acs_handler.get_nstemi_ua_management_plan(grace_score or 5, patient_acs.high_bleeding_risk or False) # Assume high risk if score unknown
-    print_plan_path(acs_plan)
-
-# PE Plan
-print("\n--- Generating PE Plan ---")
-pe_plan = pe_handler.get_investigation_management_plan(
-    has_clinical_signs_dvt=patient_pe.has_clinical_signs_dvt or False,
-    is_pe_most_likely_diagnosis=patient_pe.is_pe_most_likely_diagnosis or False,
-    heart_rate=patient_pe.heart_rate or 90,
-    had_immobilisation_or_surgery_last_4_weeks=patient_pe.had_immobilisation_or_surgery_last_4_weeks or False,
-    has_previous_dvt_or_pe=patient_pe.has_previous_dvt_or_pe or False,
-    has_haemoptysis=patient_pe.has_haemoptysis or False,
-    has_malignancy=patient_pe.has_malignancy or False,
-    is_renal_impaired=patient_pe.is_renal_impaired or False
-)
-print_plan_path(pe_plan) # This will show the start and conditional possibilities
-
-# COPD Plan
-print("\n--- Generating COPD Exacerbation Plan ---")
-copd_plan = copd_handler.get_management_plan(
-    oxygen_saturation=patient_copd.oxygen_saturation,
-    sputum_purulent=patient_copd.sputum_purulent or False,
-    resp_acidosis_present=patient_copd.resp_acidosis_present,
-    ph_level=patient_copd.ph_level
-)
-print_plan_path(copd_plan)
-
-# DKA Plan
-print("\n--- Generating DKA Plan ---")
-dka_plan = dka_handler.get_management_plan(
-    weight_kg=patient_dka.weight_kg or 70.0,
-    blood_glucose_mmol_l=patient_dka.blood_glucose_mmol_l or 99.0,
-    ph_level=patient_dka.ph_level or 7.0,
-    bicarbonate_mmol_l=patient_dka.bicarbonate_mmol_l or 5.0,
-    blood_ketones_mmol_l=patient_dka.blood_ketones_mmol_l or 99.0,
-    potassium_mmol_l=patient_dka.potassium_mmol_l or 3.0,
-    systolic_bp=patient_dka.systolic_bp or 90
-)
-print_plan_path(dka_plan)
-
-# RA Plan
-print("\n--- Generating RA Plan ---")
-ra_plan = ra_handler.get_management_plan(
-    das28_score=patient_ra.ra_das28_score,
-    failed_conventional_dmards=len(patient_ra.ra_failed_dmards),
-    failed_biologic_tnfi=DrugClass.DMARD_BIOLOGIC_TNF in patient_ra.ra_failed_dmards, # Example check
-    tb_screening_done_and_negative=patient_ra.has_active_tb == False, # Example check
-    has_active_infection=patient_ra.has_active_infection or False,
-    has_severe_heart_failure_for_tnfi=patient_ra.has_heart_failure or False # Example mapping
-)
-print_plan_path(ra_plan)
-
-# UC Plan
-print("\n--- Generating UC Induction Plan ---")
-uc_plan = uc_handler.induce_remission_plan(
-    disease_extent=patient_uc.uc_disease_extent or UCExtent.LEFT_SIDED_COLITIS, # Provide default if needed
-    severity=patient_uc.uc_severity or UCSeverity.MODERATE # Provide default if needed
-)
-print_plan_path(uc_plan)
-
-# Stroke Plan
-print("\n--- Generating Stroke Reperfusion Plan ---")
-stroke_plan = stroke_handler.get_reperfusion_plan(
-    time_since_onset_hours=patient_stroke.stroke_symptom_onset_hours or 3.0,
-    nihss_score=patient_stroke.stroke_nihss_score or 10,
-    bp_systolic=patient_stroke.stroke_bp_systolic or 170,
-    bp_diastolic=patient_stroke.stroke_bp_diastolic or 90,
-    ct_shows_haemorrhage=patient_stroke.stroke_has_intracranial_haemorrhage or False,
-    ct_shows_large_established_infarct=patient_stroke.stroke_has_large_established_infarct or False,
-    thrombolysis_contraindicated=False, # Assuming false for example
-    thrombectomy_possible=True, # Assuming capable centre
-    thrombectomy_target_vessel_present=patient_stroke.stroke_has_thrombectomy_target_vessel or False
-)
-print_plan_path(stroke_plan)
+    else:
+        missing_step_id = path[-1].default_next_step_id if path else plan.start_step_id
+        if len(path) == max_steps_to_print:
+            out.append("  ...")
+        elif missing_step_id and plan.get_step(missing_step_id) is None:
+            out.append(f"Error: Step ID '{missing_step_id}' not found in plan.")
+    out.append("")
+    sys.stdout.write("\n".join(out))
+
+
+if __name__ == "__main__":
+    # --- Data Setup ---
+    print("--- Setting up Example Patient Contexts ---")
+    # ACS Patient
+    patient_acs = PatientData(age=55, sex=Sex.MALE, is_troponin_raised=True, has_st_elevation=True, has_chest_pain_suspicious_for_acs=True)
+    # PE Patient
+    patient_pe = PatientData(has_clinical_signs_dvt=True, is_pe_most_likely_diagnosis=False, heart_rate=105, had_immobilisation_or_surgery_last_4_weeks=False, has_previous_dvt_or_pe=True, has_haemoptysis=False, has_malignancy=False, is_renal_impaired=False)
+    # COPD Patient
+    patient_copd = PatientData(oxygen_saturation=90.0, sputum_purulent=True, resp_acidosis_present=True, ph_level=7.28)
+    # DKA Patient
+    patient_dka = PatientData(weight_kg=70.0, blood_glucose_mmol_l=30.0, ph_level=7.1, bicarbonate_mmol_l=10.0, blood_ketones_mmol_l=5.0, potassium_mmol_l=3.8, systolic_bp=100)
+    # RA Patient
+    patient_ra = PatientData(ra_das28_score=5.5, ra_failed_dmards=(DrugClass.DMARD_CONVENTIONAL, DrugClass.DMARD_CONVENTIONAL), has_active_tb=False, has_active_infection=False, has_heart_failure=False)
+    # UC Patient
+    patient_uc = PatientData(uc_disease_extent=UCExtent.LEFT_SIDED_COLITIS, uc_severity=UCSeverity.MODERATE)
+    # Stroke Patient
+    patient_stroke = PatientData(stroke_symptom_onset_hours=3.0, stroke_nihss_score=15, systolic_bp=170, diastolic_bp=90, stroke_has_intracranial_haemorrhage=False, stroke_has_large_established_infarct=False, stroke_has_thrombectomy_target_vessel=True)
+
+    # --- Instantiating Handlers ---
+    print("--- Instantiating Condition Handlers ---")
+    acs_handler = get_condition(AcuteCoronarySyndrome)
+    pe_handler = get_condition(PulmonaryEmbolism)
+    copd_handler = get_condition(AcuteExacerbationCOPD) # Assumes class exists
+    dka_handler = get_condition(DiabeticKetoacidosis) # Assumes class exists
+    ra_handler = get_condition(RheumatoidArthritis)
+    uc_handler = get_condition(UlcerativeColitis) # Assumes class exists
+    stroke_handler = get_condition(AcuteIschaemicStroke) # Assumes class exists
+
+    # --- Generating and Printing Plans ---
+
+    # ACS Plan
+    print("\n--- Generating ACS Plan ---")
+    acs_type = acs_handler.diagnose_acs_type(
+        has_st_elevation=patient_acs.has_st_elevation or False,
+        is_troponin_raised=patient_acs.is_troponin_raised or False,
+        has_st_depression_or_twi=patient_acs.has_st_depression_or_twi or False,
+        has_chest_pain_suspicious_for_acs=patient_acs.has_chest_pain_suspicious_for_acs or False
+    )
+    # Numeric fields are defaulted with "is None" so a genuine 0 isn't replaced
+    def stemi_plan_for(patient: PatientData) -> AlgorithmPlan:
+        onset_hours = patient.symptom_onset_hours_acs if patient.symptom_onset_hours_acs is not None else 1.0
+        return acs_handler.get_stemi_management_plan(onset_hours, True) # Assume PCI available
+
+    def nstemi_ua_plan_for(patient: PatientData) -> AlgorithmPlan:
+        # Need GRACE score calculated (using placeholder function)
+        age = patient.age if patient.age is not None else 55
+        heart_rate = patient.heart_rate if patient.heart_rate is not None else 90
+        systolic_bp = patient.systolic_bp if patient.systolic_bp is not None else 140
+        creatinine = patient.creatinine_umol_l if patient.creatinine_umol_l is not None else 90
+        grace_score = calculate_grace_score(age, heart_rate, systolic_bp, creatinine, patient.killip_class or KillipClass.CLASS_I, patient.had_cardiac_arrest or False, patient.has_st_depression_or_twi or False, patient.is_troponin_raised or False)
+        return acs_handler.get_nstemi_ua_management_plan(grace_score if grace_score is not None else 5, patient.high_bleeding_risk or False) # Assume high risk if score unknown
+
+    # ACS type -> plan builder; no plan if ACS isn't diagnosed
+    ACS_DISPATCH = {ACSType.STEMI: stemi_plan_for, ACSType.NSTEMI: nstemi_ua_plan_for, ACSType.UNSTABLE_ANGINA: nstemi_ua_plan_for}
+    acs_plan_for = ACS_DISPATCH.get(acs_type)
+    if acs_plan_for is not None:
+        acs_plan = acs_plan_for(patient_acs)
+        print_plan_path(acs_plan)
+
+    # PE Plan
+    print("\n--- Generating PE Plan ---")
+    pe_plan = pe_handler.get_investigation_management_plan(
+        has_clinical_signs_dvt=patient_pe.has_clinical_signs_dvt or False,
+        is_pe_most_likely_diagnosis=patient_pe.is_pe_most_likely_diagnosis or False,
+        heart_rate=patient_pe.heart_rate if patient_pe.heart_rate is not None else 90,
+        had_immobilisation_or_surgery_last_4_weeks=patient_pe.had_immobilisation_or_surgery_last_4_weeks or False,
+        has_previous_dvt_or_pe=patient_pe.has_previous_dvt_or_pe or False,
+        has_haemoptysis=patient_pe.has_haemoptysis or False,
+        has_malignancy=patient_pe.has_malignancy or False,
+        is_renal_impaired=patient_pe.is_renal_impaired or False
+    )
+    print_plan_path(pe_plan) # This will show the start and conditional possibilities
+
+    # COPD Plan
+    print("\n--- Generating COPD Exacerbation Plan ---")
+    copd_plan = copd_handler.get_management_plan(
+        oxygen_saturation=patient_copd.oxygen_saturation,
+        sputum_purulent=patient_copd.sputum_purulent or False,
+        resp_acidosis_present=patient_copd.resp_acidosis_present,
+        ph_level=patient_copd.ph_level
+    )
+    print_plan_path(copd_plan)
+
+    # DKA Plan
+    print("\n--- Generating DKA Plan ---")
+    dka_plan = dka_handler.get_management_plan(
+        weight_kg=patient_dka.weight_kg if patient_dka.weight_kg is not None else 70.0,
+        blood_glucose_mmol_l=patient_dka.blood_glucose_mmol_l if patient_dka.blood_glucose_mmol_l is not None else 99.0,
+        ph_level=patient_dka.ph_level if patient_dka.ph_level is not None else 7.0,
+        bicarbonate_mmol_l=patient_dka.bicarbonate_mmol_l if patient_dka.bicarbonate_mmol_l is not None else 5.0,
+        blood_ketones_mmol_l=patient_dka.blood_ketones_mmol_l if patient_dka.blood_ketones_mmol_l is not None else 99.0,
+        potassium_mmol_l=patient_dka.potassium_mmol_l if patient_dka.potassium_mmol_l is not None else 3.0,
+        systolic_bp=patient_dka.systolic_bp if patient_dka.systolic_bp is not None else 90
+    )
+    print_plan_path(dka_plan)
+
+    # RA Plan
+    print("\n--- Generating RA Plan ---")
+    ra_plan = ra_handler.get_management_plan(
+        das28_score=patient_ra.ra_das28_score,
+        failed_conventional_dmards=len(patient_ra.ra_failed_dmards),
+        failed_biologic_tnfi=DrugClass.DMARD_BIOLOGIC_TNF in patient_ra.ra_failed_dmards, # Example check
+        tb_screening_done_and_negative=patient_ra.has_active_tb == False, # Example check
+        has_active_infection=patient_ra.has_active_infection or False,
+        has_severe_heart_failure_for_tnfi=patient_ra.has_heart_failure or False # Example mapping
+    )
+    print_plan_path(ra_plan)
+
+    # UC Plan
+    print("\n--- Generating UC Induction Plan ---")
+    uc_plan = uc_handler.induce_remission_plan(
+        disease_extent=patient_uc.uc_disease_extent or UCExtent.LEFT_SIDED_COLITIS, # Provide default if needed
+        severity=patient_uc.uc_severity or UCSeverity.MODERATE # Provide default if needed
+    )
+    print_plan_path(uc_plan)
+
+    # Stroke Plan
+    print("\n--- Generating Stroke Reperfusion Plan ---")
+    stroke_plan = stroke_handler.get_reperfusion_plan(
+        time_since_onset_hours=patient_stroke.stroke_symptom_onset_hours if patient_stroke.stroke_symptom_onset_hours is not None else 3.0,
+        nihss_score=patient_stroke.stroke_nihss_score if patient_stroke.stroke_nihss_score is not None else 10,
+        bp_systolic=patient_stroke.systolic_bp if patient_stroke.systolic_bp is not None else 170,
+        bp_diastolic=patient_stroke.diastolic_bp if patient_stroke.diastolic_bp is not None else 90,
+        ct_shows_haemorrhage=patient_stroke.stroke_has_intracranial_haemorrhage or False,
+        ct_shows_large_established_infarct=patient_stroke.stroke_has_large_established_infarct or False,
+        thrombolysis_contraindicated=False, # Assuming false for example
+        thrombectomy_possible=True, # Assuming capable centre
+        thrombectomy_target_vessel_present=patient_stroke.stroke_has_thrombectomy_target_vessel or False
+    )
+    print_plan_path(stroke_plan)